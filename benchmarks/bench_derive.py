@@ -0,0 +1,33 @@
+"""Compare symmetry-transform derivation against full puzzle generation.
+
+Usage: python benchmarks/bench_derive.py [boards_per_level] [seed]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_core import DIFFICULTY_LEVELS, SudokuGenerator
+
+
+def main():
+    boards = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    generator = SudokuGenerator(seed=seed)
+    print(f"{'level':<12}{'generate us':>14}{'derive us':>12}{'speedup':>10}")
+    for difficulty in DIFFICULTY_LEVELS:
+        start = time.perf_counter()
+        for _ in range(boards):
+            board, solution = generator.generate_board(difficulty)
+        generate = (time.perf_counter() - start) / boards
+
+        start = time.perf_counter()
+        for _ in range(boards * 100):
+            generator.derive_board(board, solution)
+        derive = (time.perf_counter() - start) / (boards * 100)
+        print(f"{difficulty:<12}{generate * 1e6:>14.0f}{derive * 1e6:>12.1f}{generate / derive:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
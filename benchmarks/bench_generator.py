@@ -0,0 +1,126 @@
+"""Compare the bitmask/MRV and DLX solvers against the original scan-based solver.
+
+Usage: python benchmarks/bench_generator.py [boards_per_level] [seed]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_core import DIFFICULTY_LEVELS, SudokuGenerator
+
+
+class ScanGenerator(SudokuGenerator):
+    """The original solver: full row/column/box scans and first-empty-cell search,
+    with a full solution count for every attempted removal"""
+
+    def _reset_masks(self):
+        pass
+
+    def _find_empty(self):
+        cells = self.grid.cells
+        for i in range(81):
+            if cells[i] == 0:
+                return i
+        return None
+
+    def _is_valid(self, row, col, num):
+        cells = self.grid.cells
+        for j in range(9):
+            if cells[row * 9 + j] == num:
+                return False
+        for i in range(9):
+            if cells[i * 9 + col] == num:
+                return False
+        box_x = col // 3
+        box_y = row // 3
+        for i in range(box_y*3, box_y*3 + 3):
+            for j in range(box_x*3, box_x*3 + 3):
+                if cells[i * 9 + j] == num and (i, j) != (row, col):
+                    return False
+        return True
+
+    def _solve_sudoku(self):
+        find = self._find_empty()
+        if find is None:
+            return True
+        row, col = divmod(find, 9)
+        for num in range(1, 10):
+            if self._is_valid(row, col, num):
+                self.nodes += 1
+                self.grid.cells[find] = num
+                if self._solve_sudoku():
+                    return True
+                self.grid.cells[find] = 0
+        return False
+
+    def _remove_numbers(self, empty_cells_count):
+        cells = self.grid.cells
+        order = list(range(81))
+        self.rng.shuffle(order)
+        removed = 0
+        for i in order:
+            if removed >= empty_cells_count:
+                break
+            if cells[i] != 0:
+                temp = cells[i]
+                cells[i] = 0
+                if self._count_solutions() == 1:
+                    removed += 1
+                else:
+                    cells[i] = temp
+
+    def _count_solutions(self):
+        saved = self.grid.snapshot()
+        count = self._solve_and_count()
+        self.grid.restore(saved)
+        return count
+
+    def _solve_and_count(self, count=0):
+        find = self._find_empty()
+        if find is None:
+            return count + 1
+        row, col = divmod(find, 9)
+        for num in range(1, 10):
+            if self._is_valid(row, col, num):
+                self.nodes += 1
+                self.grid.cells[find] = num
+                count = self._solve_and_count(count)
+                self.grid.cells[find] = 0
+                if count > 1:
+                    break
+        return count
+
+
+def run(generator_class, difficulty, boards, seed, **kwargs):
+    generator = generator_class(seed=seed, **kwargs)
+    start = time.perf_counter()
+    for _ in range(boards):
+        generator.generate_board(difficulty)
+    elapsed = time.perf_counter() - start
+    return generator.nodes / boards, elapsed / boards
+
+
+def main():
+    boards = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    print(f"{'level':<12}{'solver':<10}{'nodes/board':>14}{'ms/board':>12}")
+    for difficulty in DIFFICULTY_LEVELS:
+        results = {}
+        solvers = (
+            ("scan", ScanGenerator, {}),
+            ("bitmask", SudokuGenerator, {"uniqueness_backend": "bitmask"}),
+            ("dlx", SudokuGenerator, {"uniqueness_backend": "dlx"}),
+        )
+        for name, cls, kwargs in solvers:
+            results[name] = run(cls, difficulty, boards, seed, **kwargs)
+            nodes, seconds = results[name]
+            print(f"{difficulty:<12}{name:<10}{nodes:>14.0f}{seconds * 1000:>12.1f}")
+        for name in ("bitmask", "dlx"):
+            speedup = results["scan"][1] / results[name][1]
+            print(f"{'':<12}{name + ' x':<10}{'':>14}{speedup:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure cold-import time of the headless core against a budget.
+
+Each module is imported in a fresh interpreter so nothing is cached in
+sys.modules. Exits non-zero if a median exceeds its budget or if pygame
+gets imported along the way.
+
+Usage: python benchmarks/bench_import.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cold-import budgets in milliseconds
+IMPORT_BUDGETS_MS = {
+    "sudoku_core": 5,
+    "sudoku_core.generator": 20,
+    "sudoku_core.records": 20,
+    "sudoku_core.bank": 20,
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed * 1000, "pygame" in sys.modules)
+"""
+
+
+def measure(module, runs):
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        if output[1] == "True":
+            raise SystemExit(f"{module} imported pygame")
+        times.append(float(output[0]))
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    failed = False
+    print(f"{'module':<26}{'median ms':>10}{'budget ms':>10}")
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        median = measure(module, runs)
+        over = median > budget
+        failed |= over
+        print(f"{module:<26}{median:>10.2f}{budget:>10}{'  OVER' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
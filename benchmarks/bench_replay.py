@@ -0,0 +1,81 @@
+"""Replay throughput for stored game logs.
+
+Simulates players on generated puzzles (wrong entries, erases, undos,
+redos, hints and checks), writes the logs to a games file and times
+reading and replaying them.
+
+Usage: python benchmarks/bench_replay.py [games] [seed]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_core import DIFFICULTY_LEVELS, BoardState, SudokuGenerator
+from sudoku_core.moves import CHECK, ERASE, HINT, MOVE, MoveLog, append_game, read_games, replay, summarize
+
+
+def simulate(board, solution):
+    """Play board to the end like a somewhat careless player"""
+    state = BoardState(board, solution)
+    log = MoveLog()
+    ms = 0
+    while not state.is_solved():
+        ms += random.randint(500, 15000)
+        roll = random.random()
+        wrong = [(r, c) for r, c in sorted(state.user_cells) if state.board[r][c] != solution[r][c]]
+        row, col = state.random_empty() or random.choice(wrong)
+        if roll < 0.05:
+            log.record(HINT, ms, row, col, state.set(row, col, solution[row][col]), solution[row][col])
+        elif roll < 0.10 and log.can_undo:
+            log.undo(state, ms)
+        elif roll < 0.13 and log.can_redo:
+            log.redo(state, ms)
+        elif roll < 0.15:
+            log.record(CHECK, ms)
+        elif roll < 0.25 and wrong:
+            row, col = random.choice(wrong)
+            log.record(ERASE, ms, row, col, state.set(row, col, 0), 0)
+        else:
+            num = solution[row][col] if random.random() < 0.8 else random.randint(1, 9)
+            old = state.set(row, col, num)
+            if old != num:
+                log.record(MOVE, ms, row, col, old, num)
+    return log
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    random.seed(seed)
+
+    generator = SudokuGenerator(seed=seed)
+    puzzles = [(difficulty,) + generator.generate_board(difficulty)
+               for difficulty in DIFFICULTY_LEVELS for _ in range(10)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "games.bin")
+        events = 0
+        for i in range(count):
+            difficulty, board, solution = puzzles[i % len(puzzles)]
+            log = simulate(board, solution)
+            events += len(log)
+            append_game(board, solution, difficulty, log, filename)
+        size = os.path.getsize(filename)
+
+        start = time.perf_counter()
+        replays = [replay(game) for game in read_games(filename)]
+        seconds = time.perf_counter() - start
+
+    assert all(result.solved for result in replays)
+    print(f"{count} games, {events / count:.0f} events each, {size / count:.0f} bytes each on disk")
+    print(f"replayed in {seconds:.3f}s: {count / seconds:.0f} games/s, {events / seconds:.0f} events/s")
+    for difficulty, totals in summarize(replays).items():
+        print(f"  {difficulty}: error rate {totals['error_rate']:.1%}, {totals['ms_per_cell'] / 1000:.1f}s per cell")
+
+
+if __name__ == "__main__":
+    main()
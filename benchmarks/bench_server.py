@@ -0,0 +1,174 @@
+"""Load test for the puzzle server on localhost.
+
+Starts `python -m sudoku_core.server` on a free port, then runs many
+keep-alive clients that each loop over get puzzle -> verify -> hint for
+a fixed time, and reports requests/second and latency percentiles per
+endpoint. Before the load starts it waits (up to --warmup seconds) for
+the server's pools to fill, and fails if any is still empty, because
+requests to a dry pool measure puzzle derivation instead of the pools.
+The share of puzzles that were derived is reported with the results.
+Pass --url to test a server that is already running instead.
+
+Usage: python benchmarks/bench_server.py [--clients 64] [--seconds 10] [--workers 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sudoku_core import DIFFICULTY_LEVELS
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def request(reader, writer, method, path, payload=None):
+    """Send one keep-alive request and return (status, decoded JSON body)"""
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, deadline, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    levels = list(DIFFICULTY_LEVELS)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, puzzle = await request(reader, writer, "GET", "/puzzle?difficulty=" + quote(rng.choice(levels)))
+            latencies["puzzle"].append(time.perf_counter() - start)
+            assert status == 200, puzzle
+
+            # Fill a few cells, some of them wrongly, and ask about the board
+            board = puzzle["board"]
+            size = len(board)
+            for _ in range(5):
+                board[rng.randrange(size)][rng.randrange(size)] = rng.randint(1, size)
+            for name in ("verify", "hint"):
+                start = time.perf_counter()
+                status, result = await request(reader, writer, "POST", "/" + name,
+                                               {"id": puzzle["id"], "board": board})
+                latencies[name].append(time.perf_counter() - start)
+                assert status == 200, result
+    finally:
+        writer.close()
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, stats = await request(reader, writer, "GET", "/stats")
+    finally:
+        writer.close()
+    return stats
+
+
+async def warm_up(host, port, depth, seconds):
+    """Wait until every pool holds depth puzzles or seconds pass; returns the pool levels"""
+    deadline = time.perf_counter() + seconds
+    while True:
+        pools = (await fetch_stats(host, port))["pools"]
+        if all(level >= depth for level in pools.values()) or time.perf_counter() >= deadline:
+            return pools
+        await asyncio.sleep(0.1)
+
+
+async def load(host, port, clients, seconds, seed):
+    latencies = {"puzzle": [], "verify": [], "hint": []}
+    before = await fetch_stats(host, port)
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, deadline, latencies, random.Random(seed + i))
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed, before, await fetch_stats(host, port)
+
+
+def start_server(workers, depth):
+    """Launch the server on a free port and return (process, port)"""
+    command = [sys.executable, "-m", "sudoku_core.server", "--port", "0", "--depth", str(depth)]
+    if workers:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    if not line.startswith("Serving"):
+        process.kill()
+        raise RuntimeError(f"server didn't start: {line}{process.stderr.read()}")
+    return process, urlsplit(line.split()[-1]).port
+
+
+def stop_server(process):
+    """Ask the server to shut down cleanly, so it stops its worker processes too"""
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="server generator processes")
+    parser.add_argument("--depth", type=int, default=50, help="server pool depth per difficulty")
+    parser.add_argument("--warmup", type=float, default=60, help="most seconds to wait for the pools to fill")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="test a running server, e.g. http://127.0.0.1:8765")
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        process, port = start_server(args.workers, args.depth)
+        host = "127.0.0.1"
+    try:
+        pools = asyncio.run(warm_up(host, port, args.depth, args.warmup))
+        if not all(pools.values()):
+            sys.exit(f"pools still empty after {args.warmup:g}s of warmup: {pools}; raise --warmup")
+        latencies, elapsed, before, stats = asyncio.run(load(host, port, args.clients, args.seconds, args.seed))
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{args.clients} clients, {total} requests in {elapsed:.1f}s: {total / elapsed:.0f} requests/s")
+    print(f"{'endpoint':<10}{'count':>9}{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}{'max ms':>10}")
+    for name, samples in latencies.items():
+        print(f"{name:<10}{len(samples):>9}{percentile(samples, 0.5) * 1000:>10.2f}"
+              f"{percentile(samples, 0.99) * 1000:>10.2f}{percentile(samples, 0.999) * 1000:>10.2f}"
+              f"{max(samples) * 1000:>10.2f}")
+    served = len(latencies["puzzle"])
+    derived = stats["derived"] - before["derived"]
+    print(f"server: {derived} of {served} puzzles ({derived / max(served, 1):.0%}) derived while pools were dry, "
+          f"{stats['generated'] - before['generated']} generated, pools now {stats['pools']}")
+
+
+if __name__ == "__main__":
+    main()
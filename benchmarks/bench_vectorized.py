@@ -0,0 +1,69 @@
+"""Compare NumPy batch validation/candidates with the scalar per-grid checks.
+
+Both sides are first checked to agree on every distinct grid in the sample.
+
+Usage: python benchmarks/bench_vectorized.py [grids] [seed]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_core import SudokuGenerator, is_complete, is_valid_board
+from sudoku_core.vectorized import candidate_masks, from_boards, validate_batch
+
+
+def scalar_candidates(generator, board):
+    generator.board = board
+    generator._reset_masks()
+    return [[generator._candidates(i * 9 + j) >> 1 if board[i][j] == 0 else 0 for j in range(9)]
+            for i in range(9)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    random.seed(seed)
+
+    # A few generated puzzles and solutions, with random corruption, tiled up to count
+    generator = SudokuGenerator(seed=seed)
+    base = []
+    for _ in range(50):
+        board, solution = generator.generate_board("متوسط")
+        broken = [row[:] for row in solution]
+        broken[random.randrange(9)][random.randrange(9)] = random.randint(1, 9)
+        base += [board, solution, broken]
+    boards = [base[i % len(base)] for i in range(count)]
+    grids = from_boards(boards)
+
+    masks = SudokuGenerator()  # Only its digit masks are used, so one serves every grid
+    valid, complete = validate_batch(from_boards(base))
+    if [(bool(v), bool(c)) for v, c in zip(valid, complete)] != [(is_valid_board(b), is_complete(b)) for b in base]:
+        sys.exit("validate_batch disagrees with is_valid_board/is_complete")
+    if candidate_masks(from_boards(base)).tolist() != [scalar_candidates(masks, b) for b in base]:
+        sys.exit("candidate_masks disagrees with the scalar candidates")
+
+    scalar_sample = boards[:min(count, 20000)]
+    results = (
+        ("validate", lambda: [(is_valid_board(b), is_complete(b)) for b in scalar_sample],
+         lambda: validate_batch(grids)),
+        ("candidates", lambda: [scalar_candidates(masks, b) for b in scalar_sample],
+         lambda: candidate_masks(grids)),
+    )
+    print(f"{'check':<12}{'scalar grids/s':>16}{'numpy grids/s':>16}{'speedup':>10}")
+    for name, scalar, vectorized in results:
+        scalar_rate = len(scalar_sample) / timed(scalar)
+        numpy_rate = count / timed(vectorized)
+        print(f"{name:<12}{scalar_rate:>16.0f}{numpy_rate:>16.0f}{numpy_rate / scalar_rate:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Seeded benchmark suite for generation, board sizes, the seed cache, solving, uniqueness checks, rendering and startup.
+
+Results are written as JSON so runs can be compared:
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles")
+sys.path.insert(0, ROOT)
+
+from sudoku_core import DIFFICULTY_LEVELS, DancingLinks, PuzzleCache, SudokuGenerator
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p99/mean of samples given in seconds, reported in milliseconds"""
+    return {
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "samples": len(samples),
+    }
+
+
+def load_puzzles(name):
+    """Read 81-character puzzles from benchmarks/puzzles/<name>.txt"""
+    puzzles = []
+    with open(os.path.join(PUZZLE_DIR, name + ".txt"), encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                cells = [0 if ch in ".0" else int(ch) for ch in line]
+                puzzles.append([cells[i:i + 9] for i in range(0, 81, 9)])
+    return puzzles
+
+
+def bench_generation(seed, boards):
+    """Per-difficulty generate_board latency"""
+    results = {}
+    for difficulty in DIFFICULTY_LEVELS:
+        generator = SudokuGenerator(seed=seed)
+        samples = []
+        for _ in range(boards):
+            start = time.perf_counter()
+            generator.generate_board(difficulty)
+            samples.append(time.perf_counter() - start)
+        results[difficulty] = summarize(samples)
+        results[difficulty]["nodes_per_board"] = generator.nodes / boards
+    return results
+
+
+def bench_sizes(seed, boards, box_sizes):
+    """Per-difficulty generate_board latency on each board size (4x4 to 25x25)"""
+    results = {}
+    for box_size in box_sizes:
+        size = box_size * box_size
+        results[f"{size}x{size}"] = by_difficulty = {}
+        for difficulty in DIFFICULTY_LEVELS:
+            generator = SudokuGenerator(box_size=box_size, seed=seed)
+            samples = []
+            givens = 0
+            for _ in range(boards):
+                start = time.perf_counter()
+                board, _ = generator.generate_board(difficulty)
+                samples.append(time.perf_counter() - start)
+                givens += sum(1 for row in board for num in row if num)
+            by_difficulty[difficulty] = summarize(samples)
+            by_difficulty[difficulty]["nodes_per_board"] = generator.nodes / boards
+            by_difficulty[difficulty]["givens_per_board"] = givens / boards
+    return results
+
+
+def bench_cache(seed, boards):
+    """Seeded puzzle latency on a cache miss (generation) and on a hit"""
+    results = {}
+    for difficulty in DIFFICULTY_LEVELS:
+        cache = PuzzleCache()
+        misses, hits = [], []
+        for samples in (misses, hits):
+            for key in range(seed, seed + boards):
+                start = time.perf_counter()
+                cache.get(key, difficulty)
+                samples.append(time.perf_counter() - start)
+        results[difficulty] = {"miss": summarize(misses), "hit": summarize(hits)}
+    return results
+
+
+def bench_solver(repeat):
+    """Solve throughput on the bundled hard and 17-clue puzzle sets"""
+    results = {}
+    for name in ("hard", "17_clue"):
+        puzzles = load_puzzles(name)
+        generator = SudokuGenerator()
+        samples = []
+        for _ in range(repeat):
+            for puzzle in puzzles:
+                generator.board = puzzle
+                generator._reset_masks()
+                start = time.perf_counter()
+                generator._solve_sudoku()
+                samples.append(time.perf_counter() - start)
+        results[name] = summarize(samples)
+        results[name]["puzzles_per_s"] = len(samples) / sum(samples)
+        results[name]["nodes_per_puzzle"] = generator.nodes / len(samples)
+    return results
+
+
+def bench_uniqueness(seed, boards):
+    """Cost of one count-to-two uniqueness check per backend"""
+    generator = SudokuGenerator(seed=seed)
+    puzzles = [generator.generate_board(difficulty)[0]
+               for difficulty in DIFFICULTY_LEVELS for _ in range(boards)]
+    puzzles += load_puzzles("17_clue")
+
+    results = {}
+    bitmask = SudokuGenerator("bitmask")
+    dlx = DancingLinks()
+    for name in ("bitmask", "dlx"):
+        samples = []
+        for puzzle in puzzles:
+            start = time.perf_counter()
+            if name == "dlx":
+                dlx.count_solutions(puzzle)
+            else:
+                bitmask.board = puzzle
+                bitmask._count_solutions()
+            samples.append(time.perf_counter() - start)
+        results[name] = summarize(samples)
+    return results
+
+
+def bench_rating(seed, boards):
+    """Logical rating throughput per difficulty"""
+    from sudoku_core.rating import LogicalRater
+
+    rater = LogicalRater()
+    results = {}
+    for difficulty in DIFFICULTY_LEVELS:
+        generator = SudokuGenerator(seed=seed)
+        puzzles = [generator.generate_board(difficulty)[0] for _ in range(boards)]
+        samples = []
+        for puzzle in puzzles:
+            start = time.perf_counter()
+            rater.rate(puzzle)
+            samples.append(time.perf_counter() - start)
+        results[difficulty] = summarize(samples)
+        results[difficulty]["puzzles_per_s"] = len(samples) / sum(samples)
+    return results
+
+
+def bench_frames(seed, frames):
+    """Frame time of the full redraw and of an idle incremental render"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import sodoku
+
+    game = sodoku.SudokuGame(prefetch_depth=0)
+    game.puzzle_pool.stop()
+    game.autosaver.stop()
+    board, solution = SudokuGenerator(seed=seed).generate_board("متوسط")
+    game.loading = False
+    game._start_game(board, solution, board)
+    game.selected = (4, 4)
+    game._drawn = None
+
+    results = {}
+    for name, draw in (("draw_grid", game.draw_grid),
+                       ("draw_numbers", game.draw_numbers),
+                       ("draw_ui", game.draw_ui),
+                       ("render_idle", game.render)):
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            draw()
+            samples.append(time.perf_counter() - start)
+        results[name] = summarize(samples)
+    return results
+
+
+# Run in a fresh process: start the game, show the first frame, wait for a puzzle
+STARTUP_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+import sodoku
+game = sodoku.SudokuGame()
+game.present()
+first_frame = time.time()
+while game.loading:
+    time.sleep(0.001)
+    game.new_game()
+print(first_frame, game.first_frame_seconds, time.time())
+game.autosaver.stop()
+game.puzzle_pool.stop()
+sodoku.save_puzzles(game.box_size, game.puzzle_pool.ready_puzzles())
+"""
+
+
+def bench_startup(runs):
+    """Time to first frame and to a playable puzzle, from process launch.
+    
+    Each run is a new interpreter in an empty directory (cold: no save,
+    records or leftover puzzles) followed by one in the same directory
+    (warm: the puzzles the first run left behind are ready).
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "dummy"),
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    script = STARTUP_SCRIPT.format(root=ROOT)
+    samples = {name: {"process_first_frame": [], "game_first_frame": [], "first_puzzle": []}
+               for name in ("cold", "warm")}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("cold", "warm"):
+                start = time.time()
+                output = subprocess.run([sys.executable, "-c", script], cwd=directory, env=env,
+                                        capture_output=True, text=True, check=True).stdout
+                first_frame, game_first_frame, first_puzzle = map(float, output.split()[-3:])
+                samples[name]["process_first_frame"].append(first_frame - start)
+                samples[name]["game_first_frame"].append(game_first_frame)
+                samples[name]["first_puzzle"].append(first_puzzle - start)
+    return {name: {metric: summarize(values) for metric, values in metrics.items()}
+            for name, metrics in samples.items()}
+
+
+def compare(current, baseline, path=()):
+    """Print metrics that moved between two result files"""
+    for key, value in current.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict):
+            compare(value, old or {}, path + (key,))
+        elif key.endswith("_ms") and isinstance(old, (int, float)) and old > 0:
+            ratio = value / old
+            flag = "  REGRESSION" if ratio > 1.10 else ""
+            print(f"{'/'.join(path + (key,)):<48}{old:>10.3f}{value:>10.3f}{ratio:>8.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--boards", type=int, default=20, help="boards per difficulty")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over each puzzle set")
+    parser.add_argument("--sizes", default="2,3,4,5", help="box sizes to generate, e.g. 3,4 (empty to skip)")
+    parser.add_argument("--size-boards", type=int, default=2, help="boards per difficulty and size")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--startup-runs", type=int, default=5, help="cold and warm game launches")
+    parser.add_argument("--skip-frames", action="store_true", help="don't import pygame or launch the game")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "seed": args.seed,
+            "boards": args.boards,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "generation": bench_generation(args.seed, args.boards),
+        "sizes": bench_sizes(args.seed, args.size_boards, [int(n) for n in args.sizes.split(",") if n]),
+        "cache": bench_cache(args.seed, args.boards),
+        "solver": bench_solver(args.repeat),
+        "uniqueness": bench_uniqueness(args.seed, max(1, args.boards // 4)),
+        "rating": bench_rating(args.seed, args.boards),
+    }
+    if not args.skip_frames:
+        results["frames"] = bench_frames(args.seed, args.frames)
+        results["startup"] = bench_startup(args.startup_runs)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"{'metric':<48}{'before':>10}{'after':>10}{'ratio':>9}")
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
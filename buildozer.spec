@@ -3,7 +3,7 @@ title = سودوکو حرفه‌ای
 package.name = sudoku
 package.domain = ir.projects
 source.dir = .
-source.include_exts = py,png,jpg,kv,atlas,json
+source.include_exts = py,png,jpg,kv,atlas,json,bank,ttf
 version = 1.0
 requirements = python3,pygame,kivy
 orientation = portrait
@@ -3,24 +3,47 @@
 
 
 
-import pygame
-import sys
-import random
 import time
-import json
+
+# Start of the time-to-first-frame measurement, taken before the slow pygame import
+STARTED = time.perf_counter()
+
 import os
+import pygame
+import sys
+import threading
 from pygame.locals import *
 
-# Initialize pygame
-pygame.init()
+from sudoku_core import (
+    DIFFICULTY_LEVELS, DIGIT_SYMBOLS, PREFETCH_DEPTH,
+    CHECK, ERASE, HINT, MOVE, STATS, STATS_FILE,
+    Autosaver, BoardState, GameData, MoveLog, PuzzleBank, PuzzlePool, SudokuGenerator,
+    append_game, encode_game, load_game, load_puzzles, save_file, save_puzzles, solve,
+)
 
 # Constants
 WINDOW_SIZE = 540
-GRID_SIZE = 9
-CELL_SIZE = WINDOW_SIZE // GRID_SIZE
+BOX_SIZE = 3  # 9x9 board; 2, 4 and 5 give 4x4, 16x16 and 25x25
 FONT_SIZE = 36
 SMALL_FONT_SIZE = 18
 BUTTON_FONT_SIZE = 16
+# Optional bundled font, used instead of the system Arial when it is present.
+# None ships yet: it needs Persian glyphs and a free licence.
+FONT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts", "sudoku.ttf")
+# Event posted once per second to redraw the clock
+TIMER_EVENT = pygame.USEREVENT + 1
+# Event posted when the records have been loaded in the background
+RECORDS_EVENT = pygame.USEREVENT + 2
+# How often to check for a ready puzzle while the loading message is shown (ms)
+LOADING_POLL_MS = 50
+# How often the game in progress is saved in the background (seconds)
+AUTOSAVE_SECONDS = 10
+# Performance overlay: toggle it (and stats collection) and export the stats as JSON.
+# SUDOKU_STATS=1 in the environment starts with it on.
+STATS_KEY = pygame.K_F3
+STATS_EXPORT_KEY = pygame.K_F4
+STATS_FONT_SIZE = 13
+STATS_RECT = pygame.Rect(4, 4, 330, 200)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -36,218 +59,91 @@ BACKGROUND = (245, 245, 245)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
-# Difficulty settings - number of given cells
-DIFFICULTY_LEVELS = {
-    "آسان": 45,      # 45 given numbers
-    "متوسط": 35,     # 35 given numbers  
-    "سخت": 28,       # 28 given numbers
-    "بسیار سخت": 22  # 22 given numbers
-}
 
-class SudokuGenerator:
-    def __init__(self):
-        self.board = [[0 for _ in range(9)] for _ in range(9)]
-        self.solution = [[0 for _ in range(9)] for _ in range(9)]
-    
-    def generate_board(self, difficulty_level="متوسط"):
-        """Generate a new Sudoku board with given difficulty level"""
-        given_numbers = DIFFICULTY_LEVELS[difficulty_level]
-        empty_cells = 81 - given_numbers
-        
-        # Fill diagonal 3x3 boxes
-        self._fill_diagonal()
-        # Solve the complete board
-        self._solve_sudoku()
-        # Save the solution
-        self.solution = [row[:] for row in self.board]
-        # Remove numbers to create puzzle
-        self._remove_numbers(empty_cells)
-        return self.board, self.solution
-    
-    def _fill_diagonal(self):
-        for i in range(0, 9, 3):
-            numbers = list(range(1, 10))
-            random.shuffle(numbers)
-            for j in range(3):
-                for k in range(3):
-                    self.board[i+j][i+k] = numbers.pop()
-    
-    def _solve_sudoku(self):
-        find = self._find_empty()
-        if not find:
-            return True
-        row, col = find
-        
-        for num in range(1, 10):
-            if self._is_valid(row, col, num):
-                self.board[row][col] = num
-                if self._solve_sudoku():
-                    return True
-                self.board[row][col] = 0
-        return False
-    
-    def _find_empty(self):
-        for i in range(9):
-            for j in range(9):
-                if self.board[i][j] == 0:
-                    return (i, j)
-        return None
-    
-    def _is_valid(self, row, col, num):
-        # Check row
-        for j in range(9):
-            if self.board[row][j] == num:
-                return False
-        
-        # Check column
-        for i in range(9):
-            if self.board[i][col] == num:
-                return False
-        
-        # Check 3x3 box
-        box_x = col // 3
-        box_y = row // 3
-        for i in range(box_y*3, box_y*3 + 3):
-            for j in range(box_x*3, box_x*3 + 3):
-                if self.board[i][j] == num and (i, j) != (row, col):
-                    return False
-        
-        return True
-    
-    def _remove_numbers(self, empty_cells_count):
-        """Remove numbers from the solved board to create the puzzle"""
-        cells = [(i, j) for i in range(9) for j in range(9)]
-        random.shuffle(cells)
-        
-        removed = 0
-        for row, col in cells:
-            if removed >= empty_cells_count:
-                break
-            if self.board[row][col] != 0:
-                # Store the value
-                temp = self.board[row][col]
-                self.board[row][col] = 0
-                
-                # Check if the puzzle still has unique solution
-                temp_board = [row[:] for row in self.board]
-                solutions = self._count_solutions()
-                if solutions == 1:
-                    removed += 1
-                else:
-                    self.board[row][col] = temp
-    
-    def _count_solutions(self):
-        """Count number of solutions (simplified version)"""
-        # For performance, we'll use a simplified check
-        # In a full implementation, you'd use a more robust method
-        temp_board = [row[:] for row in self.board]
-        count = self._solve_and_count()
-        self.board = [row[:] for row in temp_board]
-        return count
-    
-    def _solve_and_count(self, count=0):
-        find = self._find_empty()
-        if not find:
-            return count + 1
-        
-        row, col = find
-        for num in range(1, 10):
-            if self._is_valid(row, col, num):
-                self.board[row][col] = num
-                count = self._solve_and_count(count)
-                self.board[row][col] = 0
-                if count > 1:  # Early exit if multiple solutions found
-                    break
-        return count
+def load_font(size):
+    """The bundled font at size, or the system Arial if there is none"""
+    if os.path.exists(FONT_FILE):
+        return pygame.font.Font(FONT_FILE, size)
+    return pygame.font.SysFont('Arial', size)
 
-class GameData:
-    def __init__(self):
-        self.filename = "sudoku_records.json"
-        self.records = self.load_records()
-    
-    def load_records(self):
-        """Load game records from JSON file"""
-        try:
-            if os.path.exists(self.filename):
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        
-        # Default structure if file doesn't exist
-        return {
-            "آسان": {"best_time": None, "history": []},
-            "متوسط": {"best_time": None, "history": []},
-            "سخت": {"best_time": None, "history": []},
-            "بسیار سخت": {"best_time": None, "history": []}
-        }
-    
-    def save_records(self):
-        """Save game records to JSON file"""
-        try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.records, f, ensure_ascii=False, indent=2)
-        except:
-            pass
-    
-    def add_record(self, difficulty, time_taken):
-        """Add a new record for the given difficulty"""
-        record = {
-            "time": time_taken,
-            "date": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        self.records[difficulty]["history"].append(record)
-        
-        # Update best time
-        if (self.records[difficulty]["best_time"] is None or 
-            time_taken < self.records[difficulty]["best_time"]):
-            self.records[difficulty]["best_time"] = time_taken
-            self.save_records()
-            return True  # New record!
-        
-        self.save_records()
-        return False  # Not a new record
-    
-    def get_best_time(self, difficulty):
-        """Get best time for given difficulty"""
-        return self.records[difficulty]["best_time"]
-    
-    def get_average_time(self, difficulty):
-        """Calculate average time for given difficulty"""
-        history = self.records[difficulty]["history"]
-        if not history:
-            return None
-        total = sum(record["time"] for record in history)
-        return total / len(history)
 
 class SudokuGame:
-    def __init__(self):
+    def __init__(self, prefetch_depth=PREFETCH_DEPTH, box_size=BOX_SIZE):
+        # Board layout: cells shrink so every size fits the same window
+        self.box_size = box_size
+        self.grid_size = box_size * box_size
+        self.cell_size = WINDOW_SIZE // self.grid_size
+        
+        # Collect stats from the start, so loading the records is measured too
+        self.show_stats = bool(os.environ.get("SUDOKU_STATS"))
+        STATS.enable(self.show_stats)
+        
+        # Initialize only the pygame modules the game uses (no audio or joysticks)
+        pygame.display.init()
+        pygame.font.init()
         self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + 150))
         pygame.display.set_caption('سودوکو حرفه‌ای - Professional Sudoku')
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont('Arial', FONT_SIZE)
-        self.small_font = pygame.font.SysFont('Arial', SMALL_FONT_SIZE)
-        self.button_font = pygame.font.SysFont('Arial', BUTTON_FONT_SIZE)
-        
-        self.generator = SudokuGenerator()
-        self.game_data = GameData()
+        self.font = load_font(FONT_SIZE)
+        self.small_font = load_font(SMALL_FONT_SIZE)
+        self.button_font = load_font(BUTTON_FONT_SIZE)
+        self.digit_font = load_font(FONT_SIZE * 9 // self.grid_size)
+        self.stats_font = load_font(STATS_FONT_SIZE)
+        self.first_frame_seconds = None  # Time to first frame, set by present()
+        
+        # The puzzle bank only holds 9x9 puzzles. Puzzles left over from the last
+        # run are ready at once, so a new game never waits on the generator.
+        bank = PuzzleBank.open_default() if box_size == 3 else None
+        self.puzzle_pool = PuzzlePool(prefetch_depth, SudokuGenerator(box_size=box_size), bank,
+                                      load_puzzles(box_size))
+        # Records are read in the background; the best time appears once they are in
+        self._game_data = None
+        self._records_loader = threading.Thread(target=self._load_records, daemon=True)
+        self._records_loader.start()
+        self.autosaver = Autosaver(save_file(box_size))
+        self._last_autosave = time.time()
         
         # Game state
         self.difficulty = "متوسط"
-        self.board, self.solution = self.generator.generate_board(self.difficulty)
+        self.board = [[0 for _ in range(self.grid_size)] for _ in range(self.grid_size)]
+        self.solution = [row[:] for row in self.board]
         self.original_board = [row[:] for row in self.board]
+        self.state = None  # BoardState of the game in progress
+        self.moves = MoveLog()  # Its move history, for undo/redo and replay
         
         self.selected = None
         self.errors = 0
         self.start_time = time.time()
         self.current_time = 0
         self.game_over = False
+        self.loading = False  # Waiting for the background generator
         self.checked_cells = set()  # Cells that have been checked
         self.showing_check = False  # Whether we're currently showing check results
         
         # Load images or create surfaces for UI elements
         self._create_ui_elements()
+        if not self.resume_game():
+            self.new_game()
+    
+    def _load_records(self):
+        self._game_data = GameData()
+        try:
+            pygame.event.post(pygame.event.Event(RECORDS_EVENT))
+        except pygame.error:
+            pass  # The game closed first
+    
+    @property
+    def game_data(self):
+        """Game records, waiting for the background load if it hasn't finished"""
+        if self._game_data is None:
+            self._records_loader.join()
+        return self._game_data
+    
+    def _best_time(self):
+        """Best time for the current board, or None while the records are still loading"""
+        if self._game_data is None:
+            return None
+        return self._game_data.get_best_time(self._record_key())
     
     def _create_ui_elements(self):
         """Create UI elements like buttons"""
@@ -263,78 +159,119 @@ class SudokuGame:
         self.check_button = pygame.Rect(140, WINDOW_SIZE + 50, 100, 35)
         self.solve_button = pygame.Rect(260, WINDOW_SIZE + 50, 100, 35)
         self.hint_button = pygame.Rect(380, WINDOW_SIZE + 50, 100, 35)
+        self.info_rect = pygame.Rect(0, WINDOW_SIZE + 90, WINDOW_SIZE, 60)
+        
+        # Glyph atlas: pre-rendered digits for every color a number can have
+        self.glyphs = {
+            color: [None] + [self.digit_font.render(DIGIT_SYMBOLS[num - 1], True, color)
+                             for num in range(1, self.grid_size + 1)]
+            for color in (BLACK, GREEN, RED, DARK_BLUE)
+        }
+        self.diff_labels = {diff: self.button_font.render(diff, True, BLACK) for diff in DIFFICULTY_LEVELS}
+        self._build_static_layer()
+        
+        # What is currently on screen, used to find dirty cells; None forces a full redraw
+        self._drawn = None
     
-    def draw_grid(self):
-        """Draw the Sudoku grid"""
-        self.screen.fill(BACKGROUND)
+    def _build_static_layer(self):
+        """Pre-render everything that never changes: background, grid lines and control buttons"""
+        self.static_layer = pygame.Surface(self.screen.get_size())
+        layer = self.static_layer
+        layer.fill(BACKGROUND)
         
         # Draw the main grid
-        for i in range(GRID_SIZE + 1):
-            # Thicker lines for 3x3 boxes
-            line_width = 4 if i % 3 == 0 else 1
+        cell_size = self.cell_size
+        grid_pixels = self.grid_size * cell_size
+        for i in range(self.grid_size + 1):
+            # Thicker lines for box edges
+            line_width = 4 if i % self.box_size == 0 else 1
             
             # Horizontal lines
             pygame.draw.line(
-                self.screen, BLACK, 
-                (0, i * CELL_SIZE), 
-                (WINDOW_SIZE, i * CELL_SIZE), 
+                layer, BLACK, 
+                (0, i * cell_size), 
+                (grid_pixels, i * cell_size), 
                 line_width
             )
             # Vertical lines
             pygame.draw.line(
-                self.screen, BLACK, 
-                (i * CELL_SIZE, 0), 
-                (i * CELL_SIZE, WINDOW_SIZE), 
+                layer, BLACK, 
+                (i * cell_size, 0), 
+                (i * cell_size, grid_pixels), 
                 line_width
             )
         
-        # Highlight selected cell
-        if self.selected:
-            row, col = self.selected
-            pygame.draw.rect(
-                self.screen, LIGHT_BLUE,
-                (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            )
-        
-        # Highlight checked cells (correct/incorrect)
-        if self.showing_check:
-            for row, col in self.checked_cells:
-                if self.board[row][col] != 0:
-                    if self.board[row][col] == self.solution[row][col]:
-                        # Correct - light green
-                        pygame.draw.rect(
-                            self.screen, LIGHT_GREEN,
-                            (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                        )
-                    else:
-                        # Incorrect - light red
-                        pygame.draw.rect(
-                            self.screen, LIGHT_RED,
-                            (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                        )
+        # Draw control buttons
+        buttons = (
+            (self.new_game_button, LIGHT_GREEN, "بازی جدید"),
+            (self.check_button, YELLOW, "بررسی پاسخ"),
+            (self.solve_button, LIGHT_BLUE, "حل سودوکو"),
+            (self.hint_button, PURPLE, "راهنمایی"),
+        )
+        for rect, color, label in buttons:
+            pygame.draw.rect(layer, color, rect)
+            layer.blit(self.button_font.render(label, True, BLACK), (rect.x + 20, rect.y + 10))
+    
+    def _cell_state(self, row, col):
+        """Return (background, number, color) describing how a cell looks"""
+        number = self.board[row][col]
+        background = None
+        color = DARK_BLUE  # Regular user input
+        
+        if self.original_board[row][col] != 0:
+            color = BLACK  # Original numbers
+        elif number != 0 and self.showing_check and (row, col) in self.checked_cells:
+            if number == self.solution[row][col]:
+                color, background = GREEN, LIGHT_GREEN  # Correct user input
+            else:
+                color, background = RED, LIGHT_RED  # Incorrect user input
+        elif number != 0 and self.state.has_conflict(row, col):
+            color = RED  # Clashes with a number in its row, column or box
+        
+        if background is None and self.selected == (row, col):
+            background = LIGHT_BLUE
+        return background, number, color
+    
+    def _draw_cell(self, row, col, state):
+        """Redraw a single cell from the static layer and glyph atlas"""
+        background, number, color = state
+        rect = pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+        self.screen.blit(self.static_layer, rect, rect)
+        if background:
+            pygame.draw.rect(self.screen, background, rect)
+        if number:
+            glyph = self.glyphs[color][number]
+            self.screen.blit(glyph, glyph.get_rect(center=rect.center))
+        return rect
+    
+    def draw_grid(self):
+        """Draw the Sudoku grid"""
+        self.screen.blit(self.static_layer, (0, 0))
+        
+        # Highlight selected and checked (correct/incorrect) cells
+        cell_size = self.cell_size
+        for row in range(self.grid_size):
+            for col in range(self.grid_size):
+                background = self._cell_state(row, col)[0]
+                if background:
+                    pygame.draw.rect(
+                        self.screen, background,
+                        (col * cell_size, row * cell_size, cell_size, cell_size)
+                    )
     
     def draw_numbers(self):
         """Draw numbers on the grid"""
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                if self.board[row][col] != 0:
-                    # Determine color based on cell state
-                    if self.original_board[row][col] != 0:
-                        color = BLACK  # Original numbers
-                    elif self.showing_check and (row, col) in self.checked_cells:
-                        if self.board[row][col] == self.solution[row][col]:
-                            color = GREEN  # Correct user input
-                        else:
-                            color = RED  # Incorrect user input
-                    else:
-                        color = DARK_BLUE  # Regular user input
-                    
-                    number_text = self.font.render(str(self.board[row][col]), True, color)
-                    text_rect = number_text.get_rect(
-                        center=((col * CELL_SIZE) + CELL_SIZE // 2, 
-                               (row * CELL_SIZE) + CELL_SIZE // 2)
+        cell_size = self.cell_size
+        for row in range(self.grid_size):
+            for col in range(self.grid_size):
+                _, number, color = self._cell_state(row, col)
+                if number != 0:
+                    glyph = self.glyphs[color][number]
+                    text_rect = glyph.get_rect(
+                        center=((col * cell_size) + cell_size // 2, 
+                               (row * cell_size) + cell_size // 2)
                     )
-                    self.screen.blit(number_text, text_rect)
+                    self.screen.blit(glyph, text_rect)
     
     def draw_ui(self):
         """Draw the user interface elements"""
@@ -342,35 +279,29 @@ class SudokuGame:
         for diff, rect in self.diff_buttons.items():
             color = LIGHT_GREEN if diff == self.difficulty else LIGHT_BLUE
             pygame.draw.rect(self.screen, color, rect)
-            diff_text = self.button_font.render(diff, True, BLACK)
-            text_rect = diff_text.get_rect(center=rect.center)
-            self.screen.blit(diff_text, text_rect)
+            diff_text = self.diff_labels[diff]
+            self.screen.blit(diff_text, diff_text.get_rect(center=rect.center))
         
-        # Draw control buttons
-        pygame.draw.rect(self.screen, LIGHT_GREEN, self.new_game_button)
-        pygame.draw.rect(self.screen, YELLOW, self.check_button)
-        pygame.draw.rect(self.screen, LIGHT_BLUE, self.solve_button)
-        pygame.draw.rect(self.screen, PURPLE, self.hint_button)
-        
-        # Draw button text
-        new_game_text = self.button_font.render("بازی جدید", True, BLACK)
-        check_text = self.button_font.render("بررسی پاسخ", True, BLACK)
-        solve_text = self.button_font.render("حل سودوکو", True, BLACK)
-        hint_text = self.button_font.render("راهنمایی", True, BLACK)
-        
-        self.screen.blit(new_game_text, (self.new_game_button.x + 20, self.new_game_button.y + 10))
-        self.screen.blit(check_text, (self.check_button.x + 20, self.check_button.y + 10))
-        self.screen.blit(solve_text, (self.solve_button.x + 20, self.solve_button.y + 10))
-        self.screen.blit(hint_text, (self.hint_button.x + 20, self.hint_button.y + 10))
-        
-        # Draw game info
-        self.current_time = int(time.time() - self.start_time)
+        self._update_time()
+        self._draw_info()
+        self._draw_overlay()
+    
+    def _update_time(self):
+        """Advance the clock shown in the info bar while a game is in progress"""
+        if not self.loading and not self.game_over:
+            self.current_time = int(time.time() - self.start_time)
+    
+    def _info_state(self):
+        return (self.errors, self.current_time, self.difficulty, self._best_time())
+    
+    def _draw_info(self):
+        """Draw the errors / time / difficulty / best time bar"""
+        self.screen.blit(self.static_layer, self.info_rect, self.info_rect)
+        best_time = self._best_time()
         
         errors_text = self.small_font.render(f"تعداد خطا: {self.errors}", True, BLACK)
         time_text = self.small_font.render(f"زمان: {self.format_time(self.current_time)}", True, BLACK)
         difficulty_text = self.small_font.render(f"سطح: {self.difficulty}", True, BLACK)
-        
-        best_time = self.game_data.get_best_time(self.difficulty)
         best_text = self.small_font.render(
             f"بهترین زمان: {self.format_time(best_time) if best_time else '---'}", 
             True, BLACK
@@ -380,6 +311,17 @@ class SudokuGame:
         self.screen.blit(time_text, (150, WINDOW_SIZE + 95))
         self.screen.blit(difficulty_text, (280, WINDOW_SIZE + 95))
         self.screen.blit(best_text, (380, WINDOW_SIZE + 95))
+        return self.info_rect
+    
+    def _draw_overlay(self):
+        """Draw the loading or game over message"""
+        # Waiting for the background generator
+        if self.loading:
+            loading_text = self.small_font.render("در حال ساخت جدول...", True, DARK_BLUE)
+            text_rect = loading_text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2))
+            pygame.draw.rect(self.screen, WHITE, text_rect.inflate(40, 20))
+            pygame.draw.rect(self.screen, DARK_BLUE, text_rect.inflate(40, 20), 3)
+            self.screen.blit(loading_text, text_rect)
         
         # Game over message
         if self.game_over:
@@ -393,12 +335,76 @@ class SudokuGame:
             self.screen.blit(game_over_text, text_rect)
             
             # Show record message if applicable
-            best_time = self.game_data.get_best_time(self.difficulty)
+            best_time = self._best_time()
             if best_time == self.current_time:
                 record_text = self.small_font.render("🎊 رکورد جدید! 🎊", True, PURPLE)
                 record_rect = record_text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2 + 40))
                 self.screen.blit(record_text, record_rect)
     
+    def render(self):
+        """Redraw only what changed since the last call and return the dirty rects"""
+        self._update_time()
+        size = self.grid_size
+        cells = [[self._cell_state(row, col) for col in range(size)] for row in range(size)]
+        info = self._info_state()
+        layout = (self.difficulty, self.loading, self.game_over, self.show_stats)
+        
+        full = self._drawn is None or self._drawn["layout"] != layout
+        if not full:
+            drawn_cells = self._drawn["cells"]
+            dirty = [(row, col) for row in range(size) for col in range(size)
+                     if cells[row][col] != drawn_cells[row][col]]
+            # Cells under the message can't be patched without redrawing it too
+            full = dirty and (self.loading or self.game_over)
+        
+        if full:
+            self.draw_grid()
+            self.draw_numbers()
+            self.draw_ui()
+            if self.show_stats:
+                self._draw_stats()
+            self._drawn = {"cells": cells, "info": info, "layout": layout}
+            return [self.screen.get_rect()]
+        
+        rects = [self._draw_cell(row, col, cells[row][col]) for row, col in dirty]
+        if info != self._drawn["info"]:
+            rects.append(self._draw_info())
+        if self.show_stats:
+            # Drawn last every frame, so cells redrawn underneath don't show through
+            rects.append(self._draw_stats())
+        
+        self._drawn = {"cells": cells, "info": info, "layout": layout}
+        return rects
+    
+    def _draw_stats(self):
+        """Draw the performance overlay: timers as last / mean / max ms, then counters"""
+        snapshot = STATS.snapshot()
+        lines = ["last / avg / max ms"]
+        lines += [f"{name}: {t['last_ms']:.2f} / {t['mean_ms']:.2f} / {t['max_ms']:.2f}  x{t['count']}"
+                  for name, t in snapshot["timers"].items()]
+        lines += [f"{name}: {value}" for name, value in snapshot["counters"].items()]
+        
+        pygame.draw.rect(self.screen, WHITE, STATS_RECT)
+        pygame.draw.rect(self.screen, DARK_BLUE, STATS_RECT, 2)
+        line_height = self.stats_font.get_linesize()
+        for i, line in enumerate(lines[:(STATS_RECT.height - 8) // line_height]):
+            text = self.stats_font.render(line, True, BLACK)
+            self.screen.blit(text, (STATS_RECT.x + 6, STATS_RECT.y + 4 + i * line_height))
+        return STATS_RECT
+    
+    def toggle_stats(self):
+        """Show or hide the performance overlay; stats are only collected while it is shown"""
+        self.show_stats = not self.show_stats
+        STATS.enable(self.show_stats)
+    
+    def export_stats(self):
+        """Write the collected stats to STATS_FILE as JSON"""
+        try:
+            STATS.export(STATS_FILE)
+            print(f"آمار در {os.path.abspath(STATS_FILE)} ذخیره شد")
+        except OSError as e:
+            print(f"ذخیره آمار ممکن نشد: {e}")
+    
     def format_time(self, seconds):
         """Format seconds into MM:SS format"""
         if seconds is None:
@@ -413,9 +419,12 @@ class SudokuGame:
         
         # Check if click is within the grid
         if y < WINDOW_SIZE:
-            row = y // CELL_SIZE
-            col = x // CELL_SIZE
-            self.selected = (row, col)
+            if self.loading:
+                return
+            row = y // self.cell_size
+            col = x // self.cell_size
+            if row < self.grid_size and col < self.grid_size:
+                self.selected = (row, col)
             return
         
         # Check difficulty buttons
@@ -427,6 +436,8 @@ class SudokuGame:
         # Check control buttons
         if self.new_game_button.collidepoint(pos):
             self.new_game()
+        elif self.loading:
+            return
         elif self.check_button.collidepoint(pos):
             self.check_solution()
         elif self.solve_button.collidepoint(pos):
@@ -436,17 +447,31 @@ class SudokuGame:
     
     def handle_keypress(self, key):
         """Handle keyboard input"""
-        if not self.selected or self.game_over:
+        if key == STATS_KEY:
+            self.toggle_stats()
+            return
+        if key == STATS_EXPORT_KEY:
+            self.export_stats()
+            return
+        # Ctrl+Z / Ctrl+Y: undo and redo
+        if key in (pygame.K_z, pygame.K_y) and pygame.key.get_mods() & KMOD_CTRL:
+            if key == pygame.K_z:
+                self.undo()
+            else:
+                self.redo()
+            return
+        if not self.selected or self.game_over or self.loading:
             return
         
         row, col = self.selected
         
         # Only allow input in non-original cells
         if self.original_board[row][col] == 0:
-            if pygame.K_1 <= key <= pygame.K_9:
-                number = key - pygame.K_0
-                old_value = self.board[row][col]
-                self.board[row][col] = number
+            number = self._key_number(key)
+            if number:
+                old_value = self.state.set(row, col, number)
+                if old_value != number:
+                    self.moves.record(MOVE, self._elapsed_ms(), row, col, old_value, number)
                 
                 # Check if the move is correct
                 if number != self.solution[row][col]:
@@ -455,27 +480,78 @@ class SudokuGame:
                 self.check_win()
             
             elif key == pygame.K_BACKSPACE or key == pygame.K_DELETE or key == pygame.K_0:
-                self.board[row][col] = 0
+                old_value = self.state.set(row, col, 0)
+                if old_value:
+                    self.moves.record(ERASE, self._elapsed_ms(), row, col, old_value, 0)
             
             # Move selection with arrow keys
             elif key == pygame.K_UP and row > 0:
                 self.selected = (row - 1, col)
-            elif key == pygame.K_DOWN and row < 8:
+            elif key == pygame.K_DOWN and row < self.grid_size - 1:
                 self.selected = (row + 1, col)
             elif key == pygame.K_LEFT and col > 0:
                 self.selected = (row, col - 1)
-            elif key == pygame.K_RIGHT and col < 8:
+            elif key == pygame.K_RIGHT and col < self.grid_size - 1:
                 self.selected = (row, col + 1)
     
+    def _key_number(self, key):
+        """The number a key enters: 1-9, then A, B, ... on boards bigger than 9x9"""
+        symbol = pygame.key.name(key).upper()
+        if len(symbol) == 1 and symbol in DIGIT_SYMBOLS[:self.grid_size]:
+            return DIGIT_SYMBOLS.index(symbol) + 1
+        return None
+    
+    def _record_key(self):
+        """Records are kept per difficulty, and per board size beyond 9x9"""
+        if self.grid_size == 9:
+            return self.difficulty
+        return f"{self.difficulty} {self.grid_size}×{self.grid_size}"
+    
     def change_difficulty(self, new_difficulty):
         """Change game difficulty"""
         self.difficulty = new_difficulty
         self.new_game()
     
     def new_game(self):
-        """Start a new game"""
-        self.board, self.solution = self.generator.generate_board(self.difficulty)
-        self.original_board = [row[:] for row in self.board]
+        """Start a new game with a prefetched puzzle, or wait for one without blocking"""
+        puzzle = self.puzzle_pool.get(self.difficulty)
+        if puzzle is None:
+            self.loading = True
+            return
+        self.loading = False
+        board, solution = puzzle
+        self._start_game(board, solution, board)
+    
+    def resume_game(self):
+        """Continue the autosaved game, if there is one for this board size"""
+        saved = load_game(save_file(self.box_size))
+        if saved is None or saved.box_size != self.box_size:
+            return False
+        # Puzzles have a unique solution, so it is solved again rather than saved
+        solution = solve(saved.original_board)
+        if solution is None:
+            return False
+        self.difficulty = saved.difficulty
+        self._start_game(saved.board, solution, saved.original_board)
+        self.errors = saved.errors
+        self.current_time = saved.elapsed
+        self.start_time = time.time() - saved.elapsed
+        if saved.moves is not None:
+            self.moves = saved.moves
+        else:
+            # Saved before move logs were kept: log the filled cells so the game still replays
+            ms = self._elapsed_ms()
+            for row, col in sorted(self.state.user_cells):
+                self.moves.record(MOVE, ms, row, col, 0, self.board[row][col])
+        return True
+    
+    def _start_game(self, board, solution, original_board):
+        self.solution = solution
+        # BoardState plays on its own copy, so the puzzle's rows are never written to
+        self.original_board = original_board
+        self.state = BoardState(board, solution, original_board)
+        self.board = self.state.board
+        self.moves = MoveLog()
         self.selected = None
         self.errors = 0
         self.start_time = time.time()
@@ -484,21 +560,50 @@ class SudokuGame:
         self.checked_cells.clear()
         self.showing_check = False
     
+    def autosave(self):
+        """Hand a snapshot of the game in progress to the background saver"""
+        self._last_autosave = time.time()
+        if self.loading or self.game_over or self.state is None:
+            return
+        elapsed = int(time.time() - self.start_time)
+        self.autosaver.save(encode_game(self.box_size, self.difficulty, self.errors, elapsed,
+                                        self.board, self.original_board, self.moves.to_bytes()))
+    
     def check_solution(self):
         """Check the current solution and highlight correct/incorrect cells"""
-        self.checked_cells.clear()
-        
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                if (self.original_board[row][col] == 0 and 
-                    self.board[row][col] != 0):
-                    self.checked_cells.add((row, col))
-        
+        self.checked_cells = set(self.state.user_cells)
         self.showing_check = True
+        self.moves.record(CHECK, self._elapsed_ms())
+    
+    def undo(self):
+        """Take back the last move, erase or hint"""
+        if self.game_over or self.loading:
+            return
+        cell = self.moves.undo(self.state, self._elapsed_ms())
+        if cell:
+            self.selected = cell
+    
+    def redo(self):
+        """Re-apply the last undone move, erase or hint"""
+        if self.game_over or self.loading:
+            return
+        cell = self.moves.redo(self.state, self._elapsed_ms())
+        if cell:
+            self.selected = cell
+            self.check_win()
+    
+    def _elapsed_ms(self):
+        return int((time.time() - self.start_time) * 1000)
     
     def solve_board(self):
         """Solve the entire board"""
-        self.board = [row[:] for row in self.solution]
+        # Reveal the remaining cells in place, logged as hints so the stored game replays to the solution
+        ms = self._elapsed_ms()
+        for row, board_row in enumerate(self.board):
+            for col, num in enumerate(board_row):
+                if num != self.solution[row][col]:
+                    self.state.set(row, col, self.solution[row][col])
+                    self.moves.record(HINT, ms, row, col, num, self.solution[row][col])
         self.game_over = True
         self._finish_game()
     
@@ -507,17 +612,12 @@ class SudokuGame:
         if self.game_over:
             return
         
-        # Find an empty cell
-        empty_cells = []
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                if self.board[row][col] == 0:
-                    empty_cells.append((row, col))
-        
-        if empty_cells:
-            # Pick a random empty cell
-            row, col = random.choice(empty_cells)
-            self.board[row][col] = self.solution[row][col]
+        # Pick a random empty cell
+        cell = self.state.random_empty()
+        if cell:
+            row, col = cell
+            self.state.set(row, col, self.solution[row][col])
+            self.moves.record(HINT, self._elapsed_ms(), row, col, 0, self.solution[row][col])
             self.selected = (row, col)
             
             # Check if game is won after hint
@@ -525,10 +625,8 @@ class SudokuGame:
     
     def check_win(self):
         """Check if the player has won"""
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                if self.board[row][col] != self.solution[row][col]:
-                    return False
+        if not self.state.is_solved():
+            return False
         
         self.game_over = True
         self._finish_game()
@@ -537,35 +635,65 @@ class SudokuGame:
     def _finish_game(self):
         """Handle game completion"""
         if self.game_over:
+            self.autosaver.clear()
+            try:
+                append_game(self.original_board, self.solution, self.difficulty, self.moves)
+            except OSError:
+                pass
             # Add record and check if it's a new best
-            is_new_record = self.game_data.add_record(self.difficulty, self.current_time)
+            is_new_record = self.game_data.add_record(self._record_key(), self.current_time)
             
             if is_new_record:
                 print(f"🎉 رکورد جدید در سطح {self.difficulty}! زمان: {self.format_time(self.current_time)}")
     
+    def present(self):
+        """Draw what changed and put it on screen; the first call records time to first frame"""
+        frame_start = time.perf_counter()
+        pygame.display.update(self.render())
+        STATS.add_time("frame.draw", time.perf_counter() - frame_start)
+        if self.first_frame_seconds is None:
+            self.first_frame_seconds = time.perf_counter() - STARTED
+            STATS.add_time("startup.first_frame", self.first_frame_seconds)
+    
     def run(self):
         """Main game loop"""
         running = True
+        # Wake up once per second to advance the clock when the player is idle
+        pygame.time.set_timer(TIMER_EVENT, 1000)
         
         while running:
-            for event in pygame.event.get():
+            if self.loading:
+                self.new_game()
+            
+            self.present()
+            
+            # Block until something happens; poll while waiting for a puzzle
+            events = [pygame.event.wait(LOADING_POLL_MS if self.loading else 0)]
+            events.extend(pygame.event.get())
+            for event in events:
                 if event.type == QUIT:
                     running = False
                 elif event.type == MOUSEBUTTONDOWN:
                     self.handle_click(event.pos)
                 elif event.type == KEYDOWN:
                     self.handle_keypress(event.key)
+                elif event.type == TIMER_EVENT and time.time() - self._last_autosave >= AUTOSAVE_SECONDS:
+                    self.autosave()
             
-            self.draw_grid()
-            self.draw_numbers()
-            self.draw_ui()
-            
-            pygame.display.flip()
             self.clock.tick(60)
         
+        self.autosave()
+        self.autosaver.stop()
+        self.puzzle_pool.stop()
+        try:
+            save_puzzles(self.box_size, self.puzzle_pool.ready_puzzles())
+        except OSError:
+            pass
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = SudokuGame()
+    # Optional board size: python sodoku.py 16
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else BOX_SIZE * BOX_SIZE
+    game = SudokuGame(box_size=round(size ** 0.5))
     game.run()
\ No newline at end of file
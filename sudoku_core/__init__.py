@@ -0,0 +1,69 @@
+"""Headless Sudoku core: generation, solving, validation and records.
+
+Nothing in this package imports pygame, and submodules are only imported
+when one of their names is first used, so `import sudoku_core` is cheap
+for batch jobs and services.
+"""
+import importlib
+
+_EXPORTS = {
+    "DIFFICULTY_LEVELS": "constants",
+    "PREFETCH_DEPTH": "constants",
+    "SEED_CACHE_SIZE": "constants",
+    "UNIQUENESS_BACKENDS": "constants",
+    "BOX_SIZES": "constants",
+    "DIGIT_SYMBOLS": "constants",
+    "DancingLinks": "dlx",
+    "PropagationSolver": "propagation",
+    "SearchLimitExceeded": "limits",
+    "SudokuGenerator": "generator",
+    "solve": "solver",
+    "count_solutions": "solver",
+    "is_valid_board": "validation",
+    "is_complete": "validation",
+    "is_solution": "validation",
+    "LogicalRater": "rating",
+    "rate": "rating",
+    "Board": "board",
+    "BoardState": "board_state",
+    "validate_batch": "vectorized",
+    "candidate_masks": "vectorized",
+    "GameData": "records",
+    "MoveLog": "moves",
+    "MOVE": "moves",
+    "ERASE": "moves",
+    "HINT": "moves",
+    "CHECK": "moves",
+    "append_game": "moves",
+    "read_games": "moves",
+    "replay": "moves",
+    "STATS": "stats",
+    "STATS_FILE": "stats",
+    "Autosaver": "savegame",
+    "encode_game": "savegame",
+    "decode_game": "savegame",
+    "load_game": "savegame",
+    "save_file": "savegame",
+    "PuzzlePool": "pool",
+    "load_puzzles": "pool",
+    "pool_file": "pool",
+    "save_puzzles": "pool",
+    "PuzzleBank": "bank",
+    "PuzzleCache": "cache",
+    "daily_seed": "cache",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,174 @@
+"""Offline puzzle bank: bulk generation and a memory-mapped reader.
+
+Build a bank with every core:
+    python -m sudoku_core.bank -n 2000 -o puzzles.bank
+
+File layout (little endian):
+    header   4s magic, B version, B level count, H record size
+    index    one entry per level: 32s utf-8 name, I offset, I count
+    records  fixed-size records, puzzle then solution, 4 bits per cell
+"""
+import mmap
+import os
+import random
+import struct
+import time
+
+MAGIC = b"SDKB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+INDEX_ENTRY = struct.Struct("<32sII")
+PACKED_BOARD_SIZE = 41  # 81 cells at 4 bits each
+RECORD_SIZE = 2 * PACKED_BOARD_SIZE
+
+# Next to the game script, one level above this package
+DEFAULT_BANK_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "puzzles.bank")
+
+
+def pack_board(board):
+    """Pack a 9x9 board into 41 bytes, two cells per byte"""
+    cells = [num for row in board for num in row] + [0]
+    return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+
+
+def unpack_board(data):
+    """Unpack 41 bytes into a 9x9 board"""
+    cells = []
+    for byte in data:
+        cells.append(byte >> 4)
+        cells.append(byte & 0x0F)
+    return [cells[i:i + 9] for i in range(0, 81, 9)]
+
+
+class PuzzleBank:
+    """Read-only, memory-mapped view of a puzzle bank file.
+
+    Only the small header is read up front; each puzzle is unpacked from
+    its fixed-size record when it is picked.
+    """
+
+    def __init__(self, filename=DEFAULT_BANK_FILE):
+        self.filename = filename
+        self._file = open(filename, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, levels, record_size = HEADER.unpack_from(self._data, 0)
+            if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+                raise ValueError(f"{filename} is not a version {VERSION} puzzle bank")
+
+            self.index = {}
+            for i in range(levels):
+                name, offset, count = INDEX_ENTRY.unpack_from(
+                    self._data, HEADER.size + i * INDEX_ENTRY.size)
+                self.index[name.rstrip(b"\0").decode("utf-8")] = (offset, count)
+        except Exception:
+            self._file.close()
+            raise
+
+    @classmethod
+    def open_default(cls, filename=DEFAULT_BANK_FILE):
+        """Open the bank if it exists and is valid, otherwise return None"""
+        try:
+            return cls(filename)
+        except (OSError, ValueError):
+            return None
+
+    def count(self, difficulty):
+        """Number of puzzles stored for difficulty"""
+        return self.index.get(difficulty, (0, 0))[1]
+
+    def get(self, difficulty, number):
+        """Return (board, solution) for record number of difficulty"""
+        offset, count = self.index[difficulty]
+        if not 0 <= number < count:
+            raise IndexError(f"{difficulty} has {count} puzzles, asked for {number}")
+        start = offset + number * RECORD_SIZE
+        return (unpack_board(self._data[start:start + PACKED_BOARD_SIZE]),
+                unpack_board(self._data[start + PACKED_BOARD_SIZE:start + RECORD_SIZE]))
+
+    def random_puzzle(self, difficulty, rng=random):
+        """Return a random (board, solution) for difficulty"""
+        return self.get(difficulty, rng.randrange(self.count(difficulty)))
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+
+def write_bank(filename, records):
+    """Write {difficulty: [packed record, ...]} to filename atomically"""
+    offset = HEADER.size + len(records) * INDEX_ENTRY.size
+    index = []
+    for difficulty, level_records in records.items():
+        name = difficulty.encode("utf-8")
+        if len(name) > 32:
+            raise ValueError(f"Difficulty name too long for bank index: {difficulty!r}")
+        index.append(INDEX_ENTRY.pack(name, offset, len(level_records)))
+        offset += len(level_records) * RECORD_SIZE
+
+    temp_name = filename + ".tmp"
+    with open(temp_name, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), RECORD_SIZE))
+        for entry in index:
+            f.write(entry)
+        for level_records in records.values():
+            f.write(b"".join(level_records))
+    os.replace(temp_name, filename)
+
+
+def _generate_chunk(task):
+    """Process-pool worker: generate count packed records for difficulty"""
+    from .generator import SudokuGenerator
+
+    difficulty, count, seed = task
+
+    generator = SudokuGenerator(seed=seed)
+    records = []
+    for _ in range(count):
+        board, solution = generator.generate_board(difficulty)
+        records.append(pack_board(board) + pack_board(solution))
+    return difficulty, records
+
+
+def build_bank(filename, per_level, workers=None, chunk_size=50, seed=None):
+    """Generate per_level puzzles for every difficulty across a process pool"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .constants import DIFFICULTY_LEVELS
+
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    tasks = []
+    for difficulty in DIFFICULTY_LEVELS:
+        for start in range(0, per_level, chunk_size):
+            tasks.append((difficulty, min(chunk_size, per_level - start), seed + len(tasks)))
+
+    records = {difficulty: [] for difficulty in DIFFICULTY_LEVELS}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for difficulty, chunk in executor.map(_generate_chunk, tasks):
+            records[difficulty].extend(chunk)
+    write_bank(filename, records)
+    return records
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate an offline Sudoku puzzle bank")
+    parser.add_argument("-n", "--count", type=int, default=1000, help="puzzles per difficulty")
+    parser.add_argument("-o", "--output", default=DEFAULT_BANK_FILE, help="bank file to write")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="puzzles per worker task")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible banks")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = build_bank(args.output, args.count, args.workers, args.chunk_size, args.seed)
+    elapsed = time.perf_counter() - start
+    total = sum(len(level_records) for level_records in records.values())
+    print(f"Wrote {total} puzzles to {args.output} in {elapsed:.1f}s "
+          f"({total / elapsed:.0f} puzzles/s, {os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Streaming batch solver and validator for 81-character puzzle files.
+
+    python -m sudoku_core.batch puzzles.txt -o results.tsv --max-nodes 200000
+
+Each input line is one puzzle, digits 1-9 with '0' or '.' for empty cells.
+Lines are read in chunks, solved on a process pool and written back in
+input order as tab-separated "puzzle status solutions solution", where
+status is one of unique, multiple, unsolvable, invalid, malformed or limit.
+Only a bounded number of chunks is in flight, so memory stays flat for
+inputs of any size.
+"""
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from .limits import SearchLimitExceeded
+from .validation import is_valid_board
+
+BATCH_BACKENDS = ("dlx", "bitmask")
+
+# Per-process solver state, set up by _init_worker
+_backend = None
+_solver = None
+_limits = (None, None)
+
+
+def parse_line(line):
+    """Parse an 81-character puzzle line into a 9x9 board, or None if malformed"""
+    line = line.strip()
+    if len(line) != 81:
+        return None
+    cells = []
+    for ch in line:
+        if ch in ".0":
+            cells.append(0)
+        elif "1" <= ch <= "9":
+            cells.append(ord(ch) - 48)
+        else:
+            return None
+    return [cells[i:i + 9] for i in range(0, 81, 9)]
+
+
+def format_board(board):
+    return "".join(str(num) for row in board for num in row)
+
+
+def _init_worker(backend, max_nodes, max_seconds):
+    global _backend, _solver, _limits
+    _backend = backend
+    if backend == "dlx":
+        from .dlx import DancingLinks
+        _solver = DancingLinks()
+    else:
+        from .generator import SudokuGenerator
+        _solver = SudokuGenerator("bitmask")
+    _limits = (max_nodes, max_seconds)
+
+
+def check_puzzle(board):
+    """Return (status, solution count, solution or None) for one board"""
+    if board is None:
+        return "malformed", 0, None
+    if not is_valid_board(board):
+        return "invalid", 0, None
+
+    _solver.set_limits(*_limits)
+    try:
+        if _backend == "dlx":
+            count = _solver.count_solutions(board, limit=2)
+        else:
+            _solver.board = board
+            count = _solver._count_solutions()
+    except SearchLimitExceeded:
+        return "limit", 0, None
+
+    status = {0: "unsolvable", 1: "unique"}.get(count, "multiple")
+    return status, count, _solver.first_solution if count else None
+
+
+def _check_chunk(lines):
+    results = []
+    for line in lines:
+        puzzle = line.strip()
+        status, count, solution = check_puzzle(parse_line(puzzle))
+        solution = format_board(solution) if solution else "-"
+        results.append(f"{puzzle}\t{status}\t{count}\t{solution}\n")
+    return results
+
+
+def run_batch(lines, output, workers=None, chunk_size=1000, backend="dlx",
+              max_nodes=None, max_seconds=None):
+    """Check every puzzle line and write results to output in input order.
+
+    Returns a dict with the number of puzzles, elapsed seconds and the
+    count of each status.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend: {backend!r}")
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    stats = {"puzzles": 0}
+    start = time.perf_counter()
+
+    def collect(future):
+        for result in future.result():
+            output.write(result)
+            status = result.split("\t", 2)[1]
+            stats[status] = stats.get(status, 0) + 1
+            stats["puzzles"] += 1
+
+    lines = iter(lines)
+    pending = deque()
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(backend, max_nodes, max_seconds)) as executor:
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_check_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve and validate a file of 81-character puzzles")
+    parser.add_argument("input", help="puzzle file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="results file, or - for stdout")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="puzzles per worker task")
+    parser.add_argument("--backend", choices=BATCH_BACKENDS, default="dlx")
+    parser.add_argument("--max-nodes", type=int, default=None, help="search node budget per puzzle")
+    parser.add_argument("--max-seconds", type=float, default=None, help="search time budget per puzzle")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        lines = (line for line in source if line.strip() and not line.startswith("#"))
+        stats = run_batch(lines, sink, args.workers, args.chunk_size, args.backend,
+                          args.max_nodes, args.max_seconds)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    seconds = stats.pop("seconds")
+    puzzles = stats.pop("puzzles")
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(stats.items()))
+    print(f"{puzzles} puzzles in {seconds:.2f}s ({puzzles / max(seconds, 1e-9):.0f} puzzles/s) - {summary}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Flat board storage shared by the generator and the solvers"""
+from .constants import geometry
+from .validation import box_size_of
+
+
+class Board:
+    """A board as one bytearray of size * size cells, row by row.
+
+    Cell (r, c) is cells[r * size + c], and geometry holds the flat unit
+    and peer tables for it, so searches index cells directly instead of
+    walking lists of rows. Saving and undoing work is snapshot(), an
+    immutable bytes copy, and restore() instead of copying every row.
+    """
+
+    __slots__ = ("box_size", "size", "geometry", "cells")
+
+    def __init__(self, box_size=3, cells=None):
+        self.geometry = geometry(box_size)
+        self.box_size = box_size
+        self.size = self.geometry.size
+        if cells is None:
+            self.cells = bytearray(self.size * self.size)
+        else:
+            self.cells = bytearray(cells)
+            if len(self.cells) != self.size * self.size:
+                raise ValueError(f"A {self.size}x{self.size} board needs {self.size * self.size} cells")
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Board holding a list of rows"""
+        box_size = box_size_of(rows)
+        if box_size is None:
+            raise ValueError(f"Unsupported board size: {len(rows)}")
+        return cls(box_size, [num for row in rows for num in row])
+
+    def to_rows(self):
+        """The cells as a new list of rows"""
+        size, cells = self.size, self.cells
+        return [list(cells[i:i + size]) for i in range(0, size * size, size)]
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, i):
+        return self.cells[i]
+
+    def __setitem__(self, i, num):
+        self.cells[i] = num
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.box_size == other.box_size and self.cells == other.cells
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Board({self.box_size}, {bytes(self.cells)!r})"
+
+    def get(self, row, col):
+        return self.cells[row * self.size + col]
+
+    def set(self, row, col, num):
+        self.cells[row * self.size + col] = num
+
+    def snapshot(self):
+        """Immutable copy of the cells, for restore()"""
+        return bytes(self.cells)
+
+    def restore(self, snapshot):
+        """Put back cells saved by snapshot(), in place"""
+        self.cells[:] = snapshot
+
+    def copy(self):
+        return Board(self.box_size, self.cells)
+
+    def empties(self):
+        """Flat indices of the empty cells"""
+        return [i for i, num in enumerate(self.cells) if not num]
+
+
+def cells_of(board):
+    """Flat cells of a Board, a snapshot or a list of rows"""
+    if isinstance(board, Board):
+        return board.cells
+    if isinstance(board, (bytes, bytearray)):
+        return board
+    return [num for row in board for num in row]
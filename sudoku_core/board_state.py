@@ -0,0 +1,99 @@
+"""Incrementally maintained state of a board being played"""
+import random
+
+from .constants import geometry
+from .validation import box_size_of
+
+
+class BoardState:
+    """A puzzle in progress with O(1) bookkeeping per move.
+
+    Per-unit digit counts, the number of cells matching the solution and
+    the set of empty cells are updated on every set(), so win detection,
+    conflict checks, candidates and hint selection never sweep the grid.
+    """
+
+    def __init__(self, board, solution, original_board=None):
+        self.board = [row[:] for row in board]
+        self.solution = solution
+        size = self.size = len(board)
+        self._box_index = geometry(box_size_of(board)).box_index
+        original_board = original_board or board
+        self.givens = {(i, j) for i in range(size) for j in range(size) if original_board[i][j]}
+
+        # counts[unit][digit]: rows, then columns, then boxes (0-8, 9-17 and 18-26 on 9x9)
+        self.counts = [[0] * (size + 1) for _ in range(3 * size)]
+        self.correct = 0
+        self.user_cells = set()  # Filled cells that aren't givens
+        self._empty = []  # Empty cells, with positions for O(1) removal
+        self._empty_index = {}
+        for i in range(size):
+            for j in range(size):
+                num = self.board[i][j]
+                self.board[i][j] = 0
+                self._add_empty(i, j)
+                if num:
+                    self.set(i, j, num)
+
+    def _units(self, row, col):
+        return row, self.size + col, 2 * self.size + self._box_index[row][col]
+
+    def _add_empty(self, row, col):
+        self._empty_index[(row, col)] = len(self._empty)
+        self._empty.append((row, col))
+
+    def _remove_empty(self, row, col):
+        index = self._empty_index.pop((row, col))
+        last = self._empty.pop()
+        if index < len(self._empty):
+            self._empty[index] = last
+            self._empty_index[last] = index
+
+    def set(self, row, col, num):
+        """Put num (0 to erase) in a cell and return the previous value"""
+        old = self.board[row][col]
+        if old == num:
+            return old
+        units = self._units(row, col)
+        if old:
+            for unit in units:
+                self.counts[unit][old] -= 1
+            if old == self.solution[row][col]:
+                self.correct -= 1
+        else:
+            self._remove_empty(row, col)
+
+        self.board[row][col] = num
+        if num:
+            for unit in units:
+                self.counts[unit][num] += 1
+            if num == self.solution[row][col]:
+                self.correct += 1
+            if (row, col) not in self.givens:
+                self.user_cells.add((row, col))
+        else:
+            self._add_empty(row, col)
+            self.user_cells.discard((row, col))
+        return old
+
+    def is_solved(self):
+        """Whether every cell matches the solution"""
+        return self.correct == self.size * self.size
+
+    def has_conflict(self, row, col):
+        """Whether the cell's value is repeated in its row, column or box"""
+        num = self.board[row][col]
+        return bool(num) and any(self.counts[unit][num] > 1 for unit in self._units(row, col))
+
+    def candidates(self, row, col):
+        """Digits not yet used in the cell's row, column or box (pencil marks)"""
+        r, c, b = (self.counts[unit] for unit in self._units(row, col))
+        return [num for num in range(1, self.size + 1) if not (r[num] or c[num] or b[num])]
+
+    @property
+    def empty_cells(self):
+        return list(self._empty)
+
+    def random_empty(self, rng=random):
+        """A random empty cell, or None if the board is full"""
+        return rng.choice(self._empty) if self._empty else None
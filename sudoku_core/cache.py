@@ -0,0 +1,81 @@
+"""Seeded puzzles behind a bounded LRU cache.
+
+A seed and a difficulty fully determine a generated puzzle, so puzzles
+people share by seed (or everyone's daily puzzle) are generated once and
+served from memory afterwards:
+
+    cache = PuzzleCache()
+    board, solution = cache.get(daily_seed(), "متوسط")
+"""
+import datetime
+import threading
+from collections import OrderedDict
+
+from .constants import SEED_CACHE_SIZE
+from .generator import SudokuGenerator
+from .stats import STATS
+
+
+def daily_seed(day=None):
+    """Seed of the puzzle for day (today by default), e.g. "2024-05-01\""""
+    return (day or datetime.date.today()).isoformat()
+
+
+class PuzzleCache:
+    """(seed, difficulty) -> (board, solution), keeping the maxsize most recently used.
+
+    Misses are generated with generator.generate_board(difficulty, seed=seed),
+    so every cache built on the same kind of generator returns the same
+    puzzle for a key. Entries are stored as tuples and handed out as fresh
+    lists, so callers may play on them freely. Misses generate under their
+    own lock, so a hit never waits for another thread's miss.
+    """
+
+    def __init__(self, generator=None, maxsize=SEED_CACHE_SIZE):
+        self.generator = generator or SudokuGenerator()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # Guards the entries and counters only
+        self._generate_lock = threading.Lock()  # The generator isn't thread-safe
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, seed, difficulty):
+        """Return (board, solution) for seed and difficulty, generating it on a miss"""
+        key = (seed, difficulty)
+        entry = self._lookup(key)
+        if entry is None:
+            with self._generate_lock:
+                # Another thread may have generated it while this one waited
+                entry = self._lookup(key)
+                if entry is None:
+                    board, solution = self.generator.generate_board(difficulty, seed=seed)
+                    entry = (tuple(map(tuple, board)), tuple(map(tuple, solution)))
+                    with self._lock:
+                        self.misses += 1
+                        STATS.count("cache.misses")
+                        self._entries[key] = entry
+                        if len(self._entries) > self.maxsize:
+                            self._entries.popitem(last=False)
+        board, solution = entry
+        return [list(row) for row in board], [list(row) for row in solution]
+
+    def _lookup(self, key):
+        """The entry for key as most recently used, counted as a hit, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                STATS.count("cache.hits")
+            return entry
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
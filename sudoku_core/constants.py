@@ -0,0 +1,86 @@
+"""Board constants and lookup tables shared by the solver and generator"""
+from collections import namedtuple
+from functools import lru_cache
+
+# Difficulty settings - number of given cells
+DIFFICULTY_LEVELS = {
+    "آسان": 45,      # 45 given numbers
+    "متوسط": 35,     # 35 given numbers  
+    "سخت": 28,       # 28 given numbers
+    "بسیار سخت": 22  # 22 given numbers
+}
+
+# Number of ready puzzles kept per difficulty by the background generator
+PREFETCH_DEPTH = 3
+
+# Seeded puzzles PuzzleCache keeps before dropping the least recently used
+SEED_CACHE_SIZE = 256
+
+# Supported box sizes: boards are box_size**2 cells on a side (4x4 to 25x25)
+BOX_SIZES = (2, 3, 4, 5)
+# How digits are written on boards bigger than 9x9
+DIGIT_SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+Geometry = namedtuple("Geometry", "box_size size all_digits box_index units flat_units peers "
+                                   "cell_row cell_col cell_box cell_units")
+
+
+@lru_cache(maxsize=None)
+def geometry(box_size):
+    """Lookup tables of a board made of box_size x box_size boxes.
+    
+    box_index[r][c] is the box of a cell and units[r][c] its row, column
+    and box cells as (row, col) lists, in that order. The rest use flat
+    cell indices i = r * size + c: flat_units lists every row, column and
+    box, peers[i] the cells sharing a unit with i, cell_row/cell_col/
+    cell_box[i] its unit numbers and cell_units[i] its three units.
+    """
+    if box_size not in BOX_SIZES:
+        raise ValueError(f"Unsupported box size: {box_size!r}")
+    size = box_size * box_size
+    box_index = [[(r // box_size) * box_size + c // box_size for c in range(size)] for r in range(size)]
+    units = [[(
+        [(r, j) for j in range(size)],
+        [(i, c) for i in range(size)],
+        [(i, j) for i in range(r - r % box_size, r - r % box_size + box_size)
+         for j in range(c - c % box_size, c - c % box_size + box_size)],
+    ) for c in range(size)] for r in range(size)]
+    
+    rows = [tuple(r * size + c for c in range(size)) for r in range(size)]
+    cols = [tuple(r * size + c for r in range(size)) for c in range(size)]
+    boxes = [tuple((b // box_size * box_size + k // box_size) * size + b % box_size * box_size + k % box_size
+                   for k in range(size)) for b in range(size)]
+    peers = [tuple(sorted({i * size + j for unit in units[r][c] for i, j in unit} - {r * size + c}))
+             for r in range(size) for c in range(size)]
+    # Bit 1..size set: every digit is still a candidate
+    all_digits = (1 << (size + 1)) - 2
+    cell_row = tuple(i // size for i in range(size * size))
+    cell_col = tuple(i % size for i in range(size * size))
+    cell_box = tuple(box_index[r][c] for r in range(size) for c in range(size))
+    cell_units = tuple((rows[cell_row[i]], cols[cell_col[i]], boxes[cell_box[i]]) for i in range(size * size))
+    return Geometry(box_size, size, all_digits, box_index, units, rows + cols + boxes, peers,
+                    cell_row, cell_col, cell_box, cell_units)
+
+
+def given_count(difficulty_level, box_size=3):
+    """Number of givens for a difficulty, scaled from 9x9 to the board's cell count"""
+    size = box_size * box_size
+    return round(DIFFICULTY_LEVELS[difficulty_level] * size * size / 81)
+
+
+# Bit 1..9 set: every digit is still a candidate
+ALL_DIGITS = 0x3FE
+
+# Precomputed lookup tables for the 9x9 constraint engine
+BOX_INDEX = geometry(3).box_index
+POPCOUNT = [bin(m).count("1") for m in range(ALL_DIGITS + 1)]
+# The row, column and box cells of each cell, in that order
+UNITS = geometry(3).units
+
+# Search nodes the propagation backend spends looking for an alternate
+# solution before keeping a clue; proving uniqueness exhaustively can take
+# minutes on 16x16 and 25x25, and giving up only costs the puzzle a given
+ALTERNATE_NODE_BUDGET = 20
+
+# Uniqueness-check backends selectable in SudokuGenerator
+UNIQUENESS_BACKENDS = ("bitmask", "dlx", "propagation")
@@ -0,0 +1,177 @@
+"""Dancing Links exact-cover solver"""
+from .board import cells_of
+from .constants import geometry
+from .limits import SearchLimits
+
+
+class DancingLinks(SearchLimits):
+    """Exact-cover Sudoku solver using Knuth's Algorithm X with Dancing Links.
+    
+    The cover matrix (729x324 for 9x9) is built once and stored in flat
+    link arrays; each call covers the rows of the givens, searches and then
+    restores the structure, so one instance can be reused for many boards.
+    """
+    
+    def __init__(self, box_size=3):
+        geo = geometry(box_size)
+        size = self.size = geo.size
+        cells = size * size
+        self.nodes = 0
+        columns = 4 * cells
+        # Node 0 is the root, nodes 1..columns are column headers
+        self.L = [i - 1 for i in range(columns + 1)]
+        self.R = [i + 1 for i in range(columns + 1)]
+        self.L[0] = columns
+        self.R[columns] = 0
+        self.U = list(range(columns + 1))
+        self.D = list(range(columns + 1))
+        self.C = list(range(columns + 1))
+        self.S = [0] * (columns + 1)
+        self.row_key = [None] * (columns + 1)  # (row, col, digit) of each node
+        self.first_solution = None
+        # First node of each (row, col, digit) matrix row
+        self.row_start = {}
+        
+        for row in range(size):
+            for col in range(size):
+                box = geo.box_index[row][col]
+                for d in range(size):
+                    self._add_row((row, col, d + 1), (
+                        1 + row * size + col,
+                        1 + cells + row * size + d,
+                        1 + 2 * cells + col * size + d,
+                        1 + 3 * cells + box * size + d,
+                    ))
+    
+    def _add_row(self, key, row_columns):
+        first = len(self.C)
+        self.row_start[key] = first
+        for k, column in enumerate(row_columns):
+            node = first + k
+            self.C.append(column)
+            self.row_key.append(key)
+            # Insert at the bottom of the column
+            self.U.append(self.U[column])
+            self.D.append(column)
+            self.D[self.U[column]] = node
+            self.U[column] = node
+            self.S[column] += 1
+            # Link into a circular row list
+            self.L.append(first + (k - 1) % len(row_columns))
+            self.R.append(first + (k + 1) % len(row_columns))
+    
+    def _cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+    
+    def _uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+    
+    def count_solutions(self, board, limit=2):
+        """Count solutions of board, stopping as soon as limit is reached.
+        
+        The first solution found is left in self.first_solution.
+        """
+        C = self.C
+        self.first_solution = None
+        self._cells = cells = cells_of(board)
+        self._chosen = []
+        # Cover the constraints satisfied by the givens
+        covered = []
+        seen = set()
+        try:
+            for i, num in enumerate(cells):
+                if num:
+                    node = self.row_start[divmod(i, self.size) + (num,)]
+                    columns = [C[node + k] for k in range(4)]
+                    if seen.intersection(columns):
+                        # Conflicting givens: no solution at all
+                        return 0
+                    seen.update(columns)
+                    for column in columns:
+                        self._cover(column)
+                        covered.append(column)
+            return self._search(limit)
+        finally:
+            self._restore(covered)
+    
+    def _restore(self, covered):
+        for column in reversed(covered):
+            self._uncover(column)
+    
+    def _record_solution(self):
+        size = self.size
+        values = list(self._cells)
+        for node in self._chosen:
+            row, col, num = self.row_key[node]
+            values[row * size + col] = num
+        self.first_solution = [values[i:i + size] for i in range(0, size * size, size)]
+    
+    def _search(self, limit):
+        R, D, C, S = self.R, self.D, self.C, self.S
+        if R[0] == 0:
+            if self.first_solution is None:
+                self._record_solution()
+            return 1
+        
+        # Choose the column with the fewest remaining rows
+        column = R[0]
+        best = S[column]
+        c = R[column]
+        while c != 0 and best > 1:
+            if S[c] < best:
+                column = c
+                best = S[c]
+            c = R[c]
+        if best == 0:
+            return 0
+        
+        self._cover(column)
+        count = 0
+        r = D[column]
+        try:
+            while r != column:
+                self.nodes += 1
+                if self.nodes >= self.node_limit:
+                    self._limit_hit()
+                j = R[r]
+                while j != r:
+                    self._cover(C[j])
+                    j = R[j]
+                self._chosen.append(r)
+                try:
+                    count += self._search(limit - count)
+                finally:
+                    # Runs on SearchLimitExceeded too, so the links are always restored
+                    self._chosen.pop()
+                    j = self.L[r]
+                    while j != r:
+                        self._uncover(C[j])
+                        j = self.L[j]
+                if count >= limit:
+                    break
+                r = D[r]
+        finally:
+            self._uncover(column)
+        return count
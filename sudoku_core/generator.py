@@ -0,0 +1,430 @@
+"""Puzzle generation on an incremental bitmask constraint engine"""
+import random
+
+from .board import Board, cells_of
+from .constants import ALTERNATE_NODE_BUDGET, UNIQUENESS_BACKENDS, geometry, given_count
+from .dlx import DancingLinks
+from .limits import SearchLimitExceeded, SearchLimits
+from .propagation import PropagationSolver
+from .stats import STATS
+
+
+class SudokuGenerator(SearchLimits):
+    """Generator for boards of box_size x box_size boxes (9x9 by default).
+    
+    The bitmask backend backtracks cell by cell and is fastest on 9x9;
+    the propagation backend (the default above 9x9) completes grids and
+    searches for alternate solutions with PropagationSolver instead.
+    All randomness comes from the generator's own RNG (self.rng), so a
+    generator built with a seed produces the same puzzles every run.
+    
+    The working board is a flat Board (self.grid) searched by cell index;
+    the board attribute reads and replaces it as a list of rows.
+    """
+    
+    def __init__(self, uniqueness_backend=None, box_size=3, seed=None):
+        geo = geometry(box_size)
+        if uniqueness_backend is None:
+            uniqueness_backend = "bitmask" if box_size <= 3 else "propagation"
+        if uniqueness_backend not in UNIQUENESS_BACKENDS:
+            raise ValueError(f"Unknown uniqueness backend: {uniqueness_backend!r}")
+        self.uniqueness_backend = uniqueness_backend
+        self.rng = random.Random(seed)  # Private, so a seed reproduces every puzzle after it
+        self.box_size = box_size
+        self.size = geo.size
+        self._all_digits = geo.all_digits
+        self._cell_row = geo.cell_row
+        self._cell_col = geo.cell_col
+        self._cell_box = geo.cell_box
+        self._cell_units = geo.cell_units
+        self._dlx = None
+        self._propagation = PropagationSolver(box_size) if uniqueness_backend == "propagation" else None
+        self._rater = None  # Created on first use of rating_band
+        self.rating = None  # Rating of the last puzzle generated with a rating band
+        self.grid = Board(box_size)
+        self._empty = self.grid.snapshot()
+        self.solution = self.grid.to_rows()
+        self._solution_cells = self._empty
+        self.nodes = 0  # Search nodes visited, for benchmarking
+        self.backtracks = 0  # Placements undone by the bitmask search
+        self.candidate_checks = 0  # Cells whose candidate mask the bitmask search computed
+        self.first_solution = None  # First solution met by the last solution count
+        self._reset_masks()
+    
+    @property
+    def board(self):
+        """The working board as a new list of rows"""
+        return self.grid.to_rows()
+    
+    @board.setter
+    def board(self, rows):
+        self.grid = Board(self.box_size, cells_of(rows))
+    
+    def generate_board(self, difficulty_level="متوسط", rating_band=None, max_attempts=50, seed=None):
+        """Generate a new Sudoku board with given difficulty level.
+        
+        With seed, the generator's RNG is reseeded first, so the same seed
+        and difficulty always give the same puzzle (e.g. a daily puzzle).
+        
+        With rating_band=(low, high), puzzles are regenerated until their
+        logical rating (see sudoku_core.rating) falls inside the band; after
+        max_attempts the last puzzle is returned as is.
+        """
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts!r}")
+        if seed is not None:
+            self.rng.seed(seed)
+        if rating_band is None:
+            return self._generate_once(difficulty_level)
+        
+        if self.size != 9:
+            raise ValueError("Rating bands are only supported on 9x9 boards")
+        if self._rater is None:
+            from .rating import LogicalRater
+            self._rater = LogicalRater()
+        
+        low, high = rating_band
+        for _ in range(max_attempts):
+            board, solution = self._generate_once(difficulty_level)
+            self.rating = self._rater.rate(board)
+            if low <= self.rating.score <= high:
+                break
+        return board, solution
+    
+    def _generate_once(self, difficulty_level):
+        given_numbers = given_count(difficulty_level, self.box_size)
+        empty_cells = self.size * self.size - given_numbers
+        totals = self._search_totals()
+        
+        with STATS.timer("generate.board"):
+            # Fill the diagonal boxes and solve the complete board; only on 4x4
+            # can random diagonal boxes leave the grid unsolvable, so retry then
+            while not self._complete_board():
+                pass
+            # Save the solution
+            self._solution_cells = self.grid.snapshot()
+            self.solution = self.grid.to_rows()
+            # Remove numbers to create puzzle
+            with STATS.timer("generate.remove_numbers"):
+                self._remove_numbers(empty_cells)
+        
+        if STATS.enabled:
+            names = ("solver.nodes", "solver.backtracks", "solver.candidate_checks")
+            for name, before, after in zip(names, totals, self._search_totals()):
+                STATS.count(name, after - before)
+        return self.grid.to_rows(), self.solution
+    
+    def _search_totals(self):
+        """Nodes, backtracks and candidate checks so far, including the propagation solver's backtracks"""
+        backtracks = self.backtracks + (self._propagation.backtracks if self._propagation else 0)
+        return self.nodes, backtracks, self.candidate_checks
+    
+    def derive_board(self, board, solution):
+        """Derive a fresh-looking puzzle from an existing one without solving.
+        
+        Relabelling digits, permuting rows within bands and columns within
+        stacks, permuting bands and stacks and transposing all map valid
+        grids to valid grids, so a puzzle with a unique solution stays unique.
+        """
+        n, rng = self.box_size, self.rng
+        rows = [band * n + r for band in rng.sample(range(n), n) for r in rng.sample(range(n), n)]
+        cols = [stack * n + c for stack in rng.sample(range(n), n) for c in rng.sample(range(n), n)]
+        digits = [0] + rng.sample(range(1, self.size + 1), self.size)
+        transpose = rng.random() < 0.5
+        
+        def apply(grid):
+            if transpose:
+                grid = list(zip(*grid))
+            return [[digits[grid[r][c]] for c in cols] for r in rows]
+        
+        return apply(board), apply(solution)
+    
+    def _complete_board(self):
+        """Fill a fresh board with a random complete grid; False if the diagonal fill was a dead end"""
+        # Start from an empty board so repeated calls don't leak old values
+        self.grid.restore(self._empty)
+        with STATS.timer("generate.fill_diagonal"):
+            self._fill_diagonal()
+        with STATS.timer("generate.solve_sudoku"):
+            if self._propagation is not None:
+                solved = self._propagation.solve(self.grid, self.rng)
+                if solved is None:
+                    return False
+                self.grid.restore(cells_of(solved))
+                return True
+            self._reset_masks()
+            return self._solve_sudoku()
+    
+    def _fill_diagonal(self):
+        n, size, cells = self.box_size, self.size, self.grid.cells
+        for i in range(0, size, n):
+            numbers = list(range(1, size + 1))
+            self.rng.shuffle(numbers)
+            for j in range(n):
+                for k in range(n):
+                    cells[(i + j) * size + i + k] = numbers.pop()
+    
+    def _reset_masks(self):
+        """Rebuild row, column and box digit masks from the current board"""
+        size = self.size
+        row_masks = self.row_masks = [0] * size
+        col_masks = self.col_masks = [0] * size
+        box_masks = self.box_masks = [0] * size
+        cell_row, cell_col, cell_box = self._cell_row, self._cell_col, self._cell_box
+        for i, num in enumerate(self.grid.cells):
+            if num:
+                bit = 1 << num
+                row_masks[cell_row[i]] |= bit
+                col_masks[cell_col[i]] |= bit
+                box_masks[cell_box[i]] |= bit
+    
+    def _place(self, i, bit):
+        self.grid.cells[i] = bit.bit_length() - 1
+        self.row_masks[self._cell_row[i]] |= bit
+        self.col_masks[self._cell_col[i]] |= bit
+        self.box_masks[self._cell_box[i]] |= bit
+    
+    def _unplace(self, i, bit):
+        self.grid.cells[i] = 0
+        self.row_masks[self._cell_row[i]] ^= bit
+        self.col_masks[self._cell_col[i]] ^= bit
+        self.box_masks[self._cell_box[i]] ^= bit
+    
+    def _candidates(self, i):
+        """Bitmask of digits that can still go in cell i"""
+        used = (self.row_masks[self._cell_row[i]] | self.col_masks[self._cell_col[i]] |
+                self.box_masks[self._cell_box[i]])
+        return ~used & self._all_digits
+    
+    def _find_best_cell(self):
+        """Find the empty cell with the fewest candidates (MRV heuristic).
+        
+        Returns None when the board is full, otherwise (cell, candidates).
+        A candidates value of 0 means the current branch is a dead end.
+        """
+        best = None
+        best_count = self.size + 1
+        cells = self.grid.cells
+        all_digits = self._all_digits
+        row_masks, col_masks, box_masks = self.row_masks, self.col_masks, self.box_masks
+        cell_row, cell_col, cell_box = self._cell_row, self._cell_col, self._cell_box
+        checks = 0
+        # bytearray.find skips over the filled cells in C
+        i = cells.find(0)
+        while i >= 0:
+            checks += 1
+            candidates = ~(row_masks[cell_row[i]] | col_masks[cell_col[i]] | box_masks[cell_box[i]]) & all_digits
+            count = candidates.bit_count()
+            if count < best_count:
+                best = (i, candidates)
+                best_count = count
+                if count <= 1:
+                    break
+            i = cells.find(0, i + 1)
+        self.candidate_checks += checks
+        return best
+    
+    def _solve_sudoku(self):
+        find = self._find_best_cell()
+        if not find:
+            return True
+        i, candidates = find
+        
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            self.nodes += 1
+            if self.nodes >= self.node_limit:
+                self._limit_hit()
+            self._place(i, bit)
+            if self._solve_sudoku():
+                return True
+            self._unplace(i, bit)
+            self.backtracks += 1
+        return False
+    
+    def _remove_numbers(self, empty_cells_count):
+        """Remove numbers from the solved board to create the puzzle.
+        
+        The board is known to have a unique solution before each removal, so
+        instead of re-counting solutions from scratch every time we:
+          * accept the removal outright if the value is still forced (a naked
+            or hidden single), since the solution set cannot have changed;
+          * reject it outright if it would empty an unavoidable set, i.e. a
+            group of cells whose values can be rearranged into a second
+            solution (found once from the full solution, before removing);
+          * otherwise search only for a solution with a different value in
+            that cell, which is much cheaper than counting to two.
+        """
+        order = list(range(self.size * self.size))
+        self.rng.shuffle(order)
+        
+        self._reset_masks()
+        self._find_unavoidable_sets()
+        
+        cells = self.grid.cells
+        removed = 0
+        for i in order:
+            if removed >= empty_cells_count:
+                break
+            if cells[i] != 0:
+                # Store the value
+                temp = cells[i]
+                if self._empties_unavoidable_set(i):
+                    continue
+                self._unplace(i, 1 << temp)
+                
+                # Check if the puzzle still has unique solution
+                if self._is_forced(i, temp):
+                    unique = True
+                elif self.uniqueness_backend == "dlx":
+                    unique = self._count_solutions() == 1
+                else:
+                    unique = self._find_alternate(i, temp) is None
+                
+                if unique:
+                    removed += 1
+                    for unavoidable in self._cell_sets[i]:
+                        unavoidable[0] -= 1
+                else:
+                    self._place(i, 1 << temp)
+    
+    def _is_forced(self, i, num):
+        """Whether num is the only possible value for the empty cell i"""
+        bit = 1 << num
+        if self._candidates(i) == bit:
+            return True
+        # Hidden single: num fits nowhere else in one of the cell's units
+        cells = self.grid.cells
+        for unit in self._cell_units[i]:
+            for j in unit:
+                if cells[j] == 0 and j != i and self._candidates(j) & bit:
+                    break
+            else:
+                return True
+        return False
+    
+    def _find_alternate(self, i, num):
+        """Find a solution with a value other than num in cell i.
+        
+        Returns the alternate solution's cells, or None if num is forced there.
+        The propagation backend returns [] instead when it runs out of
+        ALTERNATE_NODE_BUDGET, so the clue is kept without proof either way.
+        The board and masks are left exactly as they were.
+        """
+        if self._propagation is not None:
+            solver = self._propagation
+            before = solver.nodes
+            solver.set_limits(max_nodes=ALTERNATE_NODE_BUDGET)
+            try:
+                alternate = solver.find_alternate(self.grid, *divmod(i, self.size), num)
+            except SearchLimitExceeded:
+                alternate = []
+            finally:
+                solver.set_limits()
+            self.nodes += solver.nodes - before
+            return alternate
+        
+        others = self._candidates(i) & ~(1 << num)
+        puzzle = self.grid.snapshot()
+        while others:
+            bit = others & -others
+            others ^= bit
+            self.nodes += 1
+            self._place(i, bit)
+            if self._solve_sudoku():
+                alternate = self.grid.snapshot()
+                self.grid.restore(puzzle)
+                self._reset_masks()
+                return alternate
+            self._unplace(i, bit)
+            self.backtracks += 1
+        return None
+    
+    def _find_unavoidable_sets(self):
+        """Seed unavoidable sets from digit-pair swaps in the solution.
+        
+        For two digits a and b, link each a cell to the b cell in its row, its
+        column and its box. Swapping a and b across one connected group of
+        these cells still leaves one of each in every unit, so it gives a
+        second solution and at least one cell of the group must stay a clue.
+        The smallest groups are the four-cell deadly rectangles.
+        """
+        size = self.size
+        # Each set is [remaining clue count, cells]
+        self._cell_sets = [[] for _ in range(size * size)]
+        positions = [[] for _ in range(size + 1)]
+        for i, num in enumerate(self._solution_cells):
+            positions[num].append(i)
+        unit_tables = (self._cell_row, self._cell_col, self._cell_box)
+        
+        for a in range(1, size + 1):
+            for b in range(a + 1, size + 1):
+                # Union-find over the a and b cells
+                parent = {i: i for i in positions[a] + positions[b]}
+                
+                def find(i):
+                    while parent[i] != i:
+                        parent[i] = i = parent[parent[i]]
+                    return i
+                
+                for unit_of in unit_tables:
+                    partner = {unit_of[j]: j for j in positions[b]}
+                    for i in positions[a]:
+                        parent[find(i)] = find(partner[unit_of[i]])
+                groups = {}
+                for i in parent:
+                    groups.setdefault(find(i), []).append(i)
+                for cells in groups.values():
+                    self._track_unavoidable_set(cells)
+    
+    def _track_unavoidable_set(self, cells):
+        grid = self.grid.cells
+        unavoidable = [sum(1 for i in cells if grid[i] != 0), cells]
+        for i in cells:
+            self._cell_sets[i].append(unavoidable)
+    
+    def _empties_unavoidable_set(self, i):
+        """Whether cell i is the last remaining clue of an unavoidable set"""
+        return any(unavoidable[0] == 1 for unavoidable in self._cell_sets[i])
+    
+    def _count_solutions(self):
+        """Count solutions of the current board, stopping once a second one is found"""
+        if self.uniqueness_backend != "bitmask":
+            if self._propagation is not None:
+                solver = self._propagation
+            else:
+                if self._dlx is None:
+                    self._dlx = DancingLinks(self.box_size)
+                solver = self._dlx
+            before = solver.nodes
+            count = solver.count_solutions(self.grid, limit=2)
+            self.nodes += solver.nodes - before
+            self.first_solution = solver.first_solution
+            return count
+        
+        # The search restores every cell it fills, so no board copy is needed
+        self._reset_masks()
+        return self._solve_and_count()
+    
+    def _solve_and_count(self, count=0):
+        find = self._find_best_cell()
+        if not find:
+            if count == 0:
+                self.first_solution = self.grid.to_rows()
+            return count + 1
+        
+        i, candidates = find
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            self.nodes += 1
+            if self.nodes >= self.node_limit:
+                self._limit_hit()
+            self._place(i, bit)
+            count = self._solve_and_count(count)
+            self._unplace(i, bit)
+            self.backtracks += 1
+            if count > 1:  # Early exit if multiple solutions found
+                break
+        return count
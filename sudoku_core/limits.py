@@ -0,0 +1,43 @@
+"""Node and time limits for the backtracking searches"""
+import time
+
+# Nodes between clock checks when only a time limit is set
+CLOCK_CHECK_INTERVAL = 1024
+
+
+class SearchLimitExceeded(Exception):
+    """Raised from inside a search when its node or time budget runs out"""
+
+
+class SearchLimits:
+    """Mixin giving a search a node and time budget.
+
+    The search increments self.nodes and calls _limit_hit() once it passes
+    self.node_limit, so an unlimited search pays one comparison per node.
+    """
+
+    nodes = 0
+    node_limit = float("inf")
+    _max_nodes = None
+    _deadline = None
+
+    def set_limits(self, max_nodes=None, max_seconds=None):
+        """Limit the searches that follow; None means unlimited"""
+        self._max_nodes = None if max_nodes is None else self.nodes + max_nodes
+        self._deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+        self._next_checkpoint()
+
+    def _next_checkpoint(self):
+        limit = float("inf")
+        if self._deadline is not None:
+            limit = self.nodes + CLOCK_CHECK_INTERVAL
+        if self._max_nodes is not None:
+            limit = min(limit, self._max_nodes)
+        self.node_limit = limit
+
+    def _limit_hit(self):
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            raise SearchLimitExceeded("node limit reached")
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchLimitExceeded("time limit reached")
+        self._next_checkpoint()
@@ -0,0 +1,261 @@
+"""Move history with undo/redo, stored game logs and headless replay.
+
+Every change to the board is one 32-bit event in an array, with a
+millisecond timestamp in a parallel array:
+
+    bits 0-2 kind, 3-7 row, 8-12 column, 13-17 old value, 18-22 new value
+
+Undo and redo are logged as events too, so replaying a log from the
+puzzle reproduces the board exactly. Finished games are appended to a
+binary file that the replay engine reads back for analytics:
+
+    python -m sudoku_core.moves sudoku_games.bin
+"""
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+from .board_state import BoardState
+from .constants import DIFFICULTY_LEVELS
+from .savegame import pack_cells, unpack_cells
+from .validation import box_size_of
+
+MOVE, ERASE, HINT, CHECK, UNDO, REDO = range(6)
+EVENT_NAMES = ("move", "erase", "hint", "check", "undo", "redo")
+# Events that change a cell and can be undone
+UNDOABLE = (MOVE, ERASE, HINT)
+
+GAMES_FILE = "sudoku_games.bin"
+MAGIC = b"SDKG"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+# Per game: box size, difficulty index, event count
+GAME_HEADER = struct.Struct("<BBI")
+
+StoredGame = namedtuple("StoredGame", "box_size difficulty puzzle solution log")
+GameReplay = namedtuple("GameReplay", "difficulty solved duration_ms moves errors hints undos cells_filled")
+
+
+def pack_event(kind, row, col, old, new):
+    return kind | row << 3 | col << 8 | old << 13 | new << 18
+
+
+def unpack_event(event):
+    """(kind, row, col, old, new) of a packed event"""
+    return event & 7, event >> 3 & 31, event >> 8 & 31, event >> 13 & 31, event >> 18 & 31
+
+
+class MoveLog:
+    """Everything done to one board, with undo and redo.
+
+    The log only grows: undo() and redo() change the board through a
+    BoardState and append UNDO/REDO events, while two stacks of event
+    indices track what can be undone or redone next.
+    """
+
+    def __init__(self):
+        self.events = array("I")
+        self.times = array("I")  # Milliseconds since the game started
+        self._undo = []
+        self._redo = []
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        """Yield (kind, row, col, old, new, ms) for every event"""
+        for event, ms in zip(self.events, self.times):
+            yield unpack_event(event) + (ms,)
+
+    def record(self, kind, ms, row=0, col=0, old=0, new=0):
+        """Append an event; a new cell change clears the redo history"""
+        if kind in UNDOABLE:
+            self._undo.append(len(self.events))
+            self._redo.clear()
+        self.events.append(pack_event(kind, row, col, old, new))
+        self.times.append(ms)
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self, state, ms):
+        """Revert the last cell change on state; returns its (row, col) or None"""
+        if not self._undo:
+            return None
+        index = self._undo.pop()
+        _, row, col, old, new = unpack_event(self.events[index])
+        state.set(row, col, old)
+        self.events.append(pack_event(UNDO, row, col, new, old))
+        self.times.append(ms)
+        self._redo.append(index)
+        return row, col
+
+    def redo(self, state, ms):
+        """Re-apply the last undone cell change on state; returns its (row, col) or None"""
+        if not self._redo:
+            return None
+        index = self._redo.pop()
+        _, row, col, old, new = unpack_event(self.events[index])
+        state.set(row, col, new)
+        self.events.append(pack_event(REDO, row, col, old, new))
+        self.times.append(ms)
+        self._undo.append(index)
+        return row, col
+
+    def to_bytes(self):
+        events, times = self.events, self.times
+        if sys.byteorder == "big":
+            events, times = array("I", events), array("I", times)
+            events.byteswap()
+            times.byteswap()
+        return events.tobytes() + times.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, undoable=False, size=None):
+        """Log read back from to_bytes(); with undoable, undo and redo carry on where it left off.
+        
+        With size, every event must fit a size x size board, and with
+        undoable every undo and redo must have a change to take back;
+        ValueError is raised otherwise.
+        """
+        log = cls()
+        half = len(data) // 2
+        log.events.frombytes(data[:half])
+        log.times.frombytes(data[half:])
+        if sys.byteorder == "big":
+            log.events.byteswap()
+            log.times.byteswap()
+        if size is not None:
+            for event in log.events:
+                kind, row, col, old, new = unpack_event(event)
+                if kind > REDO or row >= size or col >= size or old > size or new > size:
+                    raise ValueError("move log has an event outside the board")
+        if undoable:
+            for index, event in enumerate(log.events):
+                kind = event & 7
+                if kind in UNDOABLE:
+                    log._undo.append(index)
+                    log._redo.clear()
+                elif kind == UNDO:
+                    if not log._undo:
+                        raise ValueError("move log undoes more than it did")
+                    log._redo.append(log._undo.pop())
+                elif kind == REDO:
+                    if not log._redo:
+                        raise ValueError("move log redoes more than it undid")
+                    log._undo.append(log._redo.pop())
+        return log
+
+
+def append_game(puzzle, solution, difficulty, log, filename=GAMES_FILE):
+    """Append a finished game and its move log to the games file"""
+    size = len(puzzle)
+    bits = size.bit_length()
+    record = (GAME_HEADER.pack(box_size_of(puzzle), list(DIFFICULTY_LEVELS).index(difficulty), len(log)) +
+              pack_cells([num for row in puzzle for num in row], bits) +
+              pack_cells([num for row in solution for num in row], bits) +
+              log.to_bytes())
+    with open(filename, "ab") as f:
+        if f.tell() == 0:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION))
+        f.write(record)
+
+
+def read_games(filename=GAMES_FILE):
+    """Yield every StoredGame in the games file; a torn last record is skipped"""
+    with open(filename, "rb") as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size or FILE_HEADER.unpack_from(data, 0) != (MAGIC, VERSION):
+        raise ValueError(f"{filename} is not a version {VERSION} games file")
+
+    levels = list(DIFFICULTY_LEVELS)
+    offset = FILE_HEADER.size
+    while offset + GAME_HEADER.size <= len(data):
+        box_size, level, count = GAME_HEADER.unpack_from(data, offset)
+        size = box_size * box_size
+        board_size = (size * size * size.bit_length() + 7) // 8
+        end = offset + GAME_HEADER.size + 2 * board_size + 8 * count
+        if end > len(data):
+            break
+        offset += GAME_HEADER.size
+        boards = []
+        for _ in range(2):
+            cells = unpack_cells(data[offset:offset + board_size], size * size, size.bit_length())
+            boards.append([cells[i:i + size] for i in range(0, size * size, size)])
+            offset += board_size
+        log = MoveLog.from_bytes(data[offset:end])
+        offset = end
+        yield StoredGame(box_size, levels[level], boards[0], boards[1], log)
+
+
+def replay(game):
+    """Re-run a stored game against BoardState and return its GameReplay"""
+    state = BoardState(game.puzzle, game.solution)
+    solution = game.solution
+    moves = errors = hints = undos = 0
+    for event in game.log.events:
+        kind = event & 7
+        if kind == CHECK:
+            continue
+        row, col, new = event >> 3 & 31, event >> 8 & 31, event >> 18 & 31
+        state.set(row, col, new)
+        if kind == MOVE:
+            moves += 1
+            if new != solution[row][col]:
+                errors += 1
+        elif kind == HINT:
+            hints += 1
+        elif kind == UNDO:
+            undos += 1
+    duration = game.log.times[-1] if len(game.log) else 0
+    return GameReplay(game.difficulty, state.is_solved(), duration, moves, errors, hints, undos,
+                      sum(1 for row in game.puzzle for num in row if not num))
+
+
+def summarize(replays):
+    """Per-difficulty totals of replays, plus error rate and mean time per empty cell"""
+    totals = {}
+    for result in replays:
+        level = totals.setdefault(result.difficulty, {
+            "games": 0, "solved": 0, "moves": 0, "errors": 0, "hints": 0, "undos": 0,
+            "cells": 0, "duration_ms": 0,
+        })
+        level["games"] += 1
+        level["solved"] += result.solved
+        level["moves"] += result.moves
+        level["errors"] += result.errors
+        level["hints"] += result.hints
+        level["undos"] += result.undos
+        level["cells"] += result.cells_filled
+        level["duration_ms"] += result.duration_ms
+    for level in totals.values():
+        level["error_rate"] = level["errors"] / level["moves"] if level["moves"] else 0.0
+        level["ms_per_cell"] = level["duration_ms"] / level["cells"] if level["cells"] else 0.0
+    return totals
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Replay stored game logs and print analytics")
+    parser.add_argument("games", nargs="?", default=GAMES_FILE, help="games file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    replays = [replay(game) for game in read_games(args.games)]
+    seconds = time.perf_counter() - start
+    print(json.dumps(summarize(replays), ensure_ascii=False, indent=2))
+    print(f"{len(replays)} games replayed in {seconds:.2f}s "
+          f"({len(replays) / max(seconds, 1e-9):.0f} games/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
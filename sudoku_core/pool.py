@@ -0,0 +1,159 @@
+"""Background prefetching of generated puzzles, kept across runs"""
+import os
+import struct
+import threading
+from collections import deque
+
+from .constants import DIFFICULTY_LEVELS, PREFETCH_DEPTH
+from .generator import SudokuGenerator
+from .savegame import pack_cells, unpack_cells
+
+# Ready puzzles left over when the game closes, so the next start has one at
+# once; each board size has its own file (see pool_file). Layout: 4s magic, B version, B box size, H count, then per puzzle a
+# difficulty index byte and the puzzle and solution cells packed as in saves.
+POOL_FILE = "sudoku_pool.bin"
+MAGIC = b"SDKP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+
+
+class PuzzlePool:
+    """Per-difficulty queue of ready puzzles filled by a background thread.
+    
+    get() never blocks: it pops a ready (board, solution) pair or returns
+    None, and either way wakes the worker to top the pool back up. The
+    difficulty asked for most recently is refilled first. Difficulties
+    stored in the optional puzzle bank are served from it directly, through
+    a random symmetry transform, and never generated. puzzles, e.g. from
+    load_puzzles(), are (difficulty, board, solution) that are ready
+    before the worker starts.
+    """
+    
+    def __init__(self, depth=PREFETCH_DEPTH, generator=None, bank=None, puzzles=()):
+        self.depth = depth
+        self.generator = generator or SudokuGenerator()
+        self.bank = bank
+        self._pools = {diff: deque() for diff in DIFFICULTY_LEVELS}
+        for difficulty, board, solution in puzzles:
+            self._pools[difficulty].append((board, solution))
+        self._priority = None
+        self._running = True
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+    
+    def get(self, difficulty):
+        """Pop a ready puzzle for difficulty, or None if none is ready yet"""
+        if self._in_bank(difficulty):
+            # Transform the stored puzzle so a small bank doesn't repeat itself
+            return self.generator.derive_board(*self.bank.random_puzzle(difficulty, self.generator.rng))
+        with self._condition:
+            self._priority = difficulty
+            puzzle = self._pools[difficulty].popleft() if self._pools[difficulty] else None
+            self._condition.notify()
+        return puzzle
+    
+    def ready(self, difficulty):
+        """Number of puzzles ready for difficulty"""
+        return len(self._pools[difficulty])
+    
+    def ready_puzzles(self):
+        """Every ready puzzle as (difficulty, board, solution), e.g. for save_puzzles()"""
+        with self._condition:
+            return [(diff, board, solution) for diff, pool in self._pools.items() for board, solution in pool]
+    
+    def stop(self):
+        """Stop the worker thread after its current puzzle"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+    
+    def _in_bank(self, difficulty):
+        return self.bank is not None and self.bank.count(difficulty) > 0
+    
+    def _next_difficulty(self):
+        """Pick the difficulty to generate next, or None if every pool is full"""
+        if self._priority and len(self._pools[self._priority]) < self.depth:
+            return self._priority
+        generated = [diff for diff in DIFFICULTY_LEVELS if not self._in_bank(diff)]
+        if not generated:
+            return None
+        low = min(generated, key=lambda diff: len(self._pools[diff]))
+        if len(self._pools[low]) < self.depth:
+            return low
+        return None
+    
+    def _worker(self):
+        while True:
+            with self._condition:
+                difficulty = self._next_difficulty()
+                while self._running and difficulty is None:
+                    self._condition.wait()
+                    difficulty = self._next_difficulty()
+                if not self._running:
+                    return
+            
+            puzzle = self.generator.generate_board(difficulty)
+            with self._condition:
+                self._pools[difficulty].append(puzzle)
+
+
+def pool_file(box_size=3):
+    """Leftover puzzle file for a board size"""
+    if box_size == 3:
+        return POOL_FILE
+    size = box_size * box_size
+    return f"sudoku_pool_{size}x{size}.bin"
+
+
+def save_puzzles(box_size, puzzles, filename=None):
+    """Write (difficulty, board, solution) puzzles to the file for box_size atomically"""
+    filename = filename or pool_file(box_size)
+    size = box_size * box_size
+    levels = list(DIFFICULTY_LEVELS)
+    records = [bytes([levels.index(difficulty)]) +
+               pack_cells([num for row in board for num in row], size.bit_length()) +
+               pack_cells([num for row in solution for num in row], size.bit_length())
+               for difficulty, board, solution in puzzles]
+    temp_name = filename + ".tmp"
+    with open(temp_name, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, box_size, len(records)) + b"".join(records))
+    os.replace(temp_name, filename)
+
+
+def load_puzzles(box_size, filename=None):
+    """Take the puzzles saved by save_puzzles() for box_size, or [] if there are none.
+    
+    The file is removed once read, so a run that ends without saving (e.g.
+    killed by the OS) never leaves the same puzzles to be served again.
+    """
+    filename = filename or pool_file(box_size)
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+        os.remove(filename)
+    except OSError:
+        return []
+    if len(data) < HEADER.size:
+        return []
+    magic, version, saved_box_size, count = HEADER.unpack_from(data, 0)
+    size = box_size * box_size
+    cells_size = (size * size * size.bit_length() + 7) // 8
+    if ((magic, version, saved_box_size) != (MAGIC, VERSION, box_size) or
+            len(data) != HEADER.size + count * (1 + 2 * cells_size)):
+        return []
+
+    levels = list(DIFFICULTY_LEVELS)
+    puzzles = []
+    offset = HEADER.size
+    for _ in range(count):
+        level = data[offset]
+        if level >= len(levels):
+            return []
+        boards = []
+        for start in (offset + 1, offset + 1 + cells_size):
+            cells = unpack_cells(data[start:start + cells_size], size * size, size.bit_length())
+            boards.append([cells[i:i + size] for i in range(0, size * size, size)])
+        puzzles.append((levels[level], boards[0], boards[1]))
+        offset += 1 + 2 * cells_size
+    return puzzles
@@ -0,0 +1,166 @@
+"""Constraint-propagation search for boards of any box size"""
+from .board import cells_of
+from .constants import geometry
+from .limits import SearchLimits
+
+
+class PropagationSolver(SearchLimits):
+    """Backtracking search that propagates singles at every node.
+
+    Each cell keeps a candidate bitmask (bit d set when digit d is still
+    possible). Assigning a digit removes it from the cell's peers, and
+    cells left with one candidate (naked singles) or digits left with one
+    place in a unit (hidden singles) are assigned in turn, so most of a
+    16x16 or 25x25 grid is filled without branching. A branch works on a
+    copy of the flat candidate list instead of undoing its changes.
+    Boards may be lists of rows or Boards; solutions are lists of rows.
+    """
+
+    def __init__(self, box_size=3):
+        geo = geometry(box_size)
+        self.box_size = box_size
+        self.size = geo.size
+        self.all_digits = geo.all_digits
+        self.flat_units = geo.flat_units
+        self.peers = geo.peers
+        self.nodes = 0
+        self.backtracks = 0  # Branches that led to no (further) solution
+        self.first_solution = None  # First solution met by the last search
+
+    def solve(self, board, rng=None):
+        """Return a solved copy of board, or None if it has no solution.
+
+        With rng, branch digits are tried in random order, which turns the
+        search into a generator of random complete grids.
+        """
+        self.first_solution = None
+        cands = self._candidates(board)
+        if cands is not None:
+            self._search(cands, 1, rng)
+        return self.first_solution
+
+    def count_solutions(self, board, limit=2):
+        """Count solutions of board, stopping as soon as limit is reached.
+
+        The first solution found is left in self.first_solution.
+        """
+        self.first_solution = None
+        cands = self._candidates(board)
+        if cands is None:
+            return 0
+        return self._search(cands, limit, None)
+
+    def find_alternate(self, board, row, col, num):
+        """Find a solution of board with a value other than num at (row, col).
+
+        Returns the solution grid, or None if num is forced there.
+        """
+        self.first_solution = None
+        i = row * self.size + col
+        cands = self._candidates(board, exclude=(i, 1 << num))
+        if cands is not None:
+            self._search(cands, 1, None)
+        return self.first_solution
+
+    def _candidates(self, board, exclude=None):
+        """Candidate masks of board after propagating its givens, or None if it breaks"""
+        size = self.size
+        cands = [self.all_digits] * (size * size)
+        if exclude is not None:
+            i, bit = exclude
+            cands[i] &= ~bit
+        for i, num in enumerate(cells_of(board)):
+            if num and not self._assign(cands, i, 1 << num):
+                return None
+        return cands
+
+    def _assign(self, cands, i, bit):
+        """Set cell i to bit and eliminate it from the peers; False on a contradiction"""
+        if not cands[i] & bit:
+            return False
+        cands[i] = bit
+        peers = self.peers
+        pending = [(i, bit)]
+        while pending:
+            i, bit = pending.pop()
+            for p in peers[i]:
+                m = cands[p]
+                if m & bit:
+                    m ^= bit
+                    if not m:
+                        return False
+                    cands[p] = m
+                    if not m & (m - 1):
+                        pending.append((p, m))  # Naked single
+        return True
+
+    def _propagate(self, cands):
+        """Assign hidden singles until there are none left; False on a contradiction"""
+        all_digits = self.all_digits
+        changed = True
+        while changed:
+            changed = False
+            for unit in self.flat_units:
+                once = twice = 0
+                for i in unit:
+                    m = cands[i]
+                    twice |= once & m
+                    once |= m
+                if once != all_digits:
+                    return False  # Some digit has no place left in this unit
+                hidden = once & ~twice
+                if not hidden:
+                    continue
+                for i in unit:
+                    m = cands[i] & hidden
+                    if m and cands[i] != m:
+                        if m & (m - 1) or not self._assign(cands, i, m):
+                            return False
+                        changed = True
+        return True
+
+    def _search(self, cands, limit, rng):
+        if not self._propagate(cands):
+            return 0
+
+        # Branch on the open cell with the fewest candidates
+        best = None
+        best_count = self.size + 1
+        for i, m in enumerate(cands):
+            if m & (m - 1):
+                count = m.bit_count()
+                if count < best_count:
+                    best, best_count = i, count
+                    if count == 2:
+                        break
+        if best is None:
+            if self.first_solution is None:
+                size = self.size
+                values = [m.bit_length() - 1 for m in cands]
+                self.first_solution = [values[r * size:(r + 1) * size] for r in range(size)]
+            return 1
+
+        bits = []
+        m = cands[best]
+        while m:
+            bit = m & -m
+            bits.append(bit)
+            m ^= bit
+        if rng is not None:
+            rng.shuffle(bits)
+
+        count = 0
+        for bit in bits:
+            self.nodes += 1
+            if self.nodes >= self.node_limit:
+                self._limit_hit()
+            branch = cands[:]
+            found = self._search(branch, limit - count, rng) if self._assign(branch, best, bit) else 0
+            if not found:
+                self.backtracks += 1
+            count += found
+            if count >= limit:
+                break
+            # Later branches know this digit doesn't lead to a (new) solution here
+            cands[best] ^= bit
+        return count
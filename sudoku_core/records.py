@@ -0,0 +1,170 @@
+"""Persistent game records"""
+import json
+import os
+import time
+
+from .constants import DIFFICULTY_LEVELS
+from .stats import timed
+
+
+class GameData:
+    """Game records: an append-only JSONL history plus a small JSON header.
+    
+    The header keeps a running count, total and best time per difficulty
+    and the log offset those aggregates cover. Finishing a game appends a
+    single line to the log; every COMPACT_EVERY games the aggregates are
+    folded back into the header so loading only replays a short tail.
+    """
+    
+    COMPACT_EVERY = 50
+    
+    def __init__(self):
+        self.filename = "sudoku_records.json"
+        self.log_filename = "sudoku_records.jsonl"
+        self.records = self.load_records()
+    
+    def _empty_records(self):
+        return {diff: {"best_time": None, "count": 0, "total_time": 0} for diff in DIFFICULTY_LEVELS}
+    
+    def _apply(self, records, entry):
+        """Fold one history entry into the per-difficulty aggregates"""
+        stats = records.setdefault(entry["difficulty"], {"best_time": None, "count": 0, "total_time": 0})
+        stats["count"] += 1
+        stats["total_time"] += entry["time"]
+        if stats["best_time"] is None or entry["time"] < stats["best_time"]:
+            stats["best_time"] = entry["time"]
+    
+    @timed("records.load")
+    def load_records(self):
+        """Load the header aggregates and replay the log written since"""
+        header = None
+        try:
+            if os.path.exists(self.filename):
+                with open(self.filename, 'r', encoding='utf-8') as f:
+                    header = json.load(f)
+        except (OSError, ValueError):
+            pass
+        
+        records = self._empty_records()
+        self._log_offset = 0
+        self._pending = 0
+        migrated = False
+        if header and "levels" in header:
+            records.update(header["levels"])
+            self._log_offset = header.get("log_offset", 0)
+        elif header:
+            # Old format with the full history inside the JSON file
+            self._migrate(header)
+            migrated = True
+        
+        try:
+            with open(self.log_filename, 'rb') as f:
+                f.seek(self._log_offset)
+                good_end = self._log_offset
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Torn write from a crash; dropped below
+                    try:
+                        self._apply(records, json.loads(line))
+                        self._pending += 1
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                    good_end += len(line)
+            if good_end < os.path.getsize(self.log_filename):
+                with open(self.log_filename, 'r+b') as f:
+                    f.truncate(good_end)
+        except OSError:
+            pass
+        
+        self.records = records
+        if migrated or self._pending >= self.COMPACT_EVERY:
+            self.save_records()
+        return records
+    
+    def _migrate(self, old_records):
+        """Move history out of an old-format records file into the log.
+        
+        The log is written whole and renamed into place, and only when there
+        is no log yet, so a run that stops before the new header is saved
+        finds the history already moved and replays it instead of adding it
+        again.
+        """
+        if os.path.exists(self.log_filename) and os.path.getsize(self.log_filename):
+            return
+        temp_name = self.log_filename + ".tmp"
+        try:
+            with open(temp_name, 'w', encoding='utf-8') as f:
+                for difficulty, data in old_records.items():
+                    for record in data.get("history", []):
+                        entry = {"difficulty": difficulty, "time": record["time"], "date": record["date"]}
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(temp_name, self.log_filename)
+        except (OSError, KeyError, AttributeError, TypeError):
+            pass
+    
+    @timed("records.save")
+    def save_records(self):
+        """Compact: write the current aggregates to the header atomically"""
+        try:
+            offset = os.path.getsize(self.log_filename) if os.path.exists(self.log_filename) else 0
+            header = {"version": 2, "log_offset": offset, "levels": self.records}
+            temp_name = self.filename + ".tmp"
+            with open(temp_name, 'w', encoding='utf-8') as f:
+                json.dump(header, f, ensure_ascii=False, indent=2)
+            os.replace(temp_name, self.filename)
+            self._log_offset = offset
+            self._pending = 0
+        except OSError:
+            pass
+    
+    @timed("records.add")
+    def add_record(self, difficulty, time_taken):
+        """Add a new record for the given difficulty"""
+        record = {
+            "difficulty": difficulty,
+            "time": time_taken,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        
+        best_time = self.records.get(difficulty, {}).get("best_time")
+        is_new_record = best_time is None or time_taken < best_time
+        self._apply(self.records, record)
+        
+        try:
+            with open(self.log_filename, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._pending += 1
+        except OSError:
+            pass
+        if self._pending >= self.COMPACT_EVERY:
+            self.save_records()
+        
+        return is_new_record
+    
+    def get_history(self, difficulty):
+        """Read the full history for given difficulty from the log"""
+        history = []
+        try:
+            with open(self.log_filename, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("difficulty") == difficulty:
+                        history.append({"time": entry["time"], "date": entry["date"]})
+        except OSError:
+            pass
+        return history
+    
+    def get_best_time(self, difficulty):
+        """Get best time for given difficulty"""
+        stats = self.records.get(difficulty)
+        return stats["best_time"] if stats else None
+    
+    def get_average_time(self, difficulty):
+        """Calculate average time for given difficulty"""
+        stats = self.records.get(difficulty)
+        if not stats or not stats["count"]:
+            return None
+        return stats["total_time"] / stats["count"]
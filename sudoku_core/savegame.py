@@ -0,0 +1,155 @@
+"""Compact binary save of the game in progress, written in the background.
+
+File layout (little endian):
+    header   4s magic, B version, B box size, B difficulty index, H errors, I elapsed seconds
+    cells    every cell's value, packed at the fewest bits that hold the largest digit
+    givens   one bit per cell, set for the puzzle's clues
+    moves    the game's move log so far (MoveLog.to_bytes), to the end of the file
+
+A 9x9 save is 65 bytes plus 8 per logged event. The solution isn't
+stored: the puzzle has exactly one, so it is solved again on resume.
+Version 1 saves, written before moves were kept, still load with moves
+set to None; otherwise moves is the MoveLog, checked to fit the board.
+"""
+import os
+import struct
+import threading
+from collections import namedtuple
+
+from .constants import DIFFICULTY_LEVELS, geometry
+
+MAGIC = b"SDKS"
+VERSION = 2
+HEADER = struct.Struct("<4sBBBHI")
+SAVE_FILE = "sudoku_save.bin"
+
+SavedGame = namedtuple("SavedGame", "box_size difficulty errors elapsed board original_board moves")
+
+
+def save_file(box_size=3):
+    """Save file for a board size, so each size keeps its own game in progress"""
+    if box_size == 3:
+        return SAVE_FILE
+    size = box_size * box_size
+    return f"sudoku_save_{size}x{size}.bin"
+
+
+def pack_cells(values, bits):
+    """Pack small non-negative ints at bits each, little endian"""
+    packed = 0
+    for value in reversed(values):
+        packed = (packed << bits) | value
+    return packed.to_bytes((len(values) * bits + 7) // 8, "little")
+
+
+def unpack_cells(data, count, bits):
+    """Unpack count values of bits each written by pack_cells"""
+    packed = int.from_bytes(data, "little")
+    mask = (1 << bits) - 1
+    return [(packed >> (i * bits)) & mask for i in range(count)]
+
+
+def encode_game(box_size, difficulty, errors, elapsed, board, original_board, moves=b""):
+    """Pack a game in progress and its move log bytes into bytes"""
+    size = box_size * box_size
+    cells = [num for row in board for num in row]
+    givens = [1 if num else 0 for row in original_board for num in row]
+    header = HEADER.pack(MAGIC, VERSION, box_size, list(DIFFICULTY_LEVELS).index(difficulty),
+                         min(errors, 0xFFFF), elapsed)
+    return header + pack_cells(cells, size.bit_length()) + pack_cells(givens, 1) + moves
+
+
+def decode_game(data):
+    """Unpack bytes written by encode_game into a SavedGame"""
+    if len(data) < HEADER.size:
+        raise ValueError("save data is truncated")
+    magic, version, box_size, level, errors, elapsed = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"not a version {VERSION} save")
+    size = geometry(box_size).size
+    cells_size = (size * size * size.bit_length() + 7) // 8
+    givens_end = HEADER.size + cells_size + (size * size + 7) // 8
+    moves_size = len(data) - givens_end
+    if (moves_size < 0 or moves_size % 8 or (version == 1 and moves_size) or
+            level >= len(DIFFICULTY_LEVELS)):
+        raise ValueError("save data is corrupt")
+
+    cells = unpack_cells(data[HEADER.size:HEADER.size + cells_size], size * size, size.bit_length())
+    givens = unpack_cells(data[HEADER.size + cells_size:givens_end], size * size, 1)
+    board = [cells[i:i + size] for i in range(0, size * size, size)]
+    original = [num if given else 0 for num, given in zip(cells, givens)]
+    original_board = [original[i:i + size] for i in range(0, size * size, size)]
+    moves = None
+    if version == VERSION:
+        from .moves import MoveLog  # moves imports this module
+        moves = MoveLog.from_bytes(data[givens_end:], undoable=True, size=size)
+    return SavedGame(box_size, list(DIFFICULTY_LEVELS)[level], errors, elapsed, board, original_board, moves)
+
+
+def load_game(filename=SAVE_FILE):
+    """Read the saved game, or None if there is none or it can't be read"""
+    try:
+        with open(filename, "rb") as f:
+            return decode_game(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+class Autosaver:
+    """Writes save snapshots to disk from a background thread.
+
+    save() only hands the bytes over and returns, so the game loop never
+    waits on the disk. The worker writes the newest snapshot to a temporary
+    file and renames it over the save, so a crash mid-write leaves the
+    previous save intact; snapshots handed over while a write is running
+    are coalesced into the latest one.
+    """
+
+    def __init__(self, filename=SAVE_FILE):
+        self.filename = filename
+        self._pending = None  # Bytes to write, b"" to delete the save
+        self._running = True
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def save(self, data):
+        """Queue data to be written"""
+        with self._condition:
+            self._pending = data
+            self._condition.notify()
+
+    def clear(self):
+        """Queue removal of the save, e.g. once the game is over"""
+        self.save(b"")
+
+    def stop(self):
+        """Write anything still queued and stop the worker thread"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                data, self._pending = self._pending, None
+            if data is None:
+                return
+            self._write(data)
+
+    def _write(self, data):
+        try:
+            if data:
+                temp_name = self.filename + ".tmp"
+                with open(temp_name, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_name, self.filename)
+            elif os.path.exists(self.filename):
+                os.remove(self.filename)
+        except OSError:
+            pass
@@ -0,0 +1,397 @@
+"""Asyncio HTTP puzzle service for many clients on one machine.
+
+    python -m sudoku_core.server --port 8765 -j 4
+
+Endpoints (JSON in and out, boards as lists of rows):
+    GET  /puzzle?difficulty=<name>   {"id", "difficulty", "box_size", "board"}
+    POST /verify  {"id", "board"}    {"solved", "wrong": [[row, col], ...]}
+    POST /hint    {"id", "board"}    {"hint": {"row", "col", "value"} or null}
+    GET  /stats                      pool levels and service counters
+
+Puzzles are generated on a process pool into per-difficulty pools, so a
+request only pops a ready puzzle and never waits on generation. If a
+pool runs dry under load, a symmetry transform of a random one of the
+last puzzles generated for that difficulty is returned instead (still
+unique, see SudokuGenerator.derive_board). Difficulties in the optional 9x9 puzzle
+bank are always served from it that way. Solutions stay on the server,
+so verify and hint refer to a puzzle by the id it was served with.
+"""
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+from collections import OrderedDict, deque
+from itertools import count
+from urllib.parse import parse_qs, urlsplit
+
+from .constants import DIFFICULTY_LEVELS
+from .generator import SudokuGenerator
+from .stats import STATS
+
+DEFAULT_PORT = 8765
+# Ready puzzles kept per difficulty
+SERVER_POOL_DEPTH = 50
+# Recently generated puzzles per difficulty that dry pools derive from
+DERIVE_WINDOW = 50
+# Served puzzles whose solutions are kept for verify and hint
+ISSUED_LIMIT = 100000
+MAX_BODY = 64 * 1024
+
+ROUTES = {"/puzzle": "GET", "/verify": "POST", "/hint": "POST", "/stats": "GET"}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 503: "Service Unavailable"}
+
+# Per-process generator, set up by _init_worker
+_generator = None
+
+
+def _init_worker(box_size):
+    global _generator
+    # Ctrl+C reaches the whole process group; only the server decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _generator = SudokuGenerator(box_size=box_size)
+
+
+def _generate(difficulty):
+    """Process-pool worker: one (board, solution) for difficulty"""
+    return _generator.generate_board(difficulty)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PuzzleService:
+    """Per-difficulty puzzle pools topped up by a process pool, plus served solutions.
+
+    At most two generation tasks per worker are in flight; the emptiest
+    pool is refilled first. Call start() inside the event loop and close()
+    when done.
+    """
+
+    def __init__(self, depth=SERVER_POOL_DEPTH, workers=None, box_size=3, bank=None):
+        self.depth = depth
+        self.workers = workers or os.cpu_count() or 1
+        self.box_size = box_size
+        self.bank = bank if box_size == 3 else None
+        self.rng = random.Random()
+        self._deriver = SudokuGenerator(box_size=box_size)  # Only derives, never generates here
+        self._pools = {diff: deque() for diff in DIFFICULTY_LEVELS}
+        self._recent = {diff: deque(maxlen=DERIVE_WINDOW) for diff in DIFFICULTY_LEVELS}
+        self._waiters = {diff: deque() for diff in DIFFICULTY_LEVELS}
+        self._issued = OrderedDict()  # id -> (puzzle, solution)
+        self._ids = count(1)
+        self.generated = 0
+        self.derived = 0
+        self.failed = 0
+        self._executor = None
+        self._filler = None
+        self._wakeup = None
+
+    def _new_executor(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.box_size,))
+
+    async def start(self):
+        self._executor = self._new_executor()
+        self._wakeup = asyncio.Event()
+        self._filler = asyncio.create_task(self._fill())
+
+    async def close(self):
+        if self._filler is not None:
+            self._filler.cancel()
+            try:
+                await self._filler
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            # Wait for the workers to exit so none outlive the server
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+
+    def _in_bank(self, difficulty):
+        return self.bank is not None and self.bank.count(difficulty) > 0
+
+    def _next_difficulty(self, in_flight):
+        """The generated difficulty furthest below depth, counting tasks in flight, or None"""
+        best, best_level = None, self.depth
+        for difficulty in DIFFICULTY_LEVELS:
+            if self._in_bank(difficulty):
+                continue
+            level = len(self._pools[difficulty]) + in_flight.get(difficulty, 0) - len(self._waiters[difficulty])
+            if level < best_level:
+                best, best_level = difficulty, level
+        return best
+
+    async def _fill(self):
+        loop = asyncio.get_running_loop()
+        pending = {}  # future -> (difficulty, executor it runs on)
+        in_flight = {}
+        try:
+            while True:
+                while len(pending) < 2 * self.workers:
+                    difficulty = self._next_difficulty(in_flight)
+                    if difficulty is None:
+                        break
+                    future = loop.run_in_executor(self._executor, _generate, difficulty)
+                    pending[future] = (difficulty, self._executor)
+                    in_flight[difficulty] = in_flight.get(difficulty, 0) + 1
+                if not pending:
+                    # Every pool is full: sleep until a puzzle is taken
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    difficulty, executor = pending.pop(future)
+                    in_flight[difficulty] -= 1
+                    waiters = self._waiters[difficulty]
+                    while waiters and waiters[0].done():
+                        waiters.popleft()  # Client went away
+                    try:
+                        puzzle = future.result()
+                    except Exception as e:
+                        self._generation_failed(difficulty, executor, e)
+                        continue
+                    self.generated += 1
+                    self._recent[difficulty].append(puzzle)
+                    if waiters:
+                        waiters.popleft().set_result(puzzle)
+                    else:
+                        self._pools[difficulty].append(puzzle)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _generation_failed(self, difficulty, executor, error):
+        """Keep the filler going after a failed task, and fail the requests waiting on it"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        self.failed += 1
+        STATS.count("server.generate_failed")
+        print(f"Generating a {difficulty} puzzle failed: {error!r}", file=sys.stderr, flush=True)
+        waiters = self._waiters[difficulty]
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(HTTPError(503, "puzzle generation failed, try again"))
+        if isinstance(error, BrokenProcessPool) and executor is self._executor:
+            # A worker died: the executor takes no more work, so replace it
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+    async def puzzle(self, difficulty):
+        """Serve a puzzle for difficulty: (id, board)"""
+        if difficulty not in self._pools:
+            raise HTTPError(400, f"unknown difficulty: {difficulty!r}")
+        pool = self._pools[difficulty]
+        if self._in_bank(difficulty):
+            board, solution = self._deriver.derive_board(*self.bank.random_puzzle(difficulty, self.rng))
+            self.derived += 1
+        elif pool:
+            board, solution = pool.popleft()
+            self._wakeup.set()
+        elif self._recent[difficulty]:
+            board, solution = self._deriver.derive_board(*self.rng.choice(self._recent[difficulty]))
+            self.derived += 1
+            self._wakeup.set()
+        else:
+            # Nothing generated for this difficulty yet: wait for the first puzzle
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[difficulty].append(waiter)
+            self._wakeup.set()
+            board, solution = await waiter
+
+        puzzle_id = next(self._ids)
+        self._issued[puzzle_id] = (board, solution)
+        if len(self._issued) > ISSUED_LIMIT:
+            self._issued.popitem(last=False)
+        return puzzle_id, board
+
+    def _solution(self, request):
+        """Solution of the puzzle a request refers to, after checking its board"""
+        try:
+            _, solution = self._issued[request["id"]]
+        except (KeyError, TypeError):
+            raise HTTPError(404, "unknown puzzle id") from None
+        board = request.get("board")
+        size = len(solution)
+        if (not isinstance(board, list) or len(board) != size or
+                any(not isinstance(row, list) or len(row) != size for row in board)):
+            raise HTTPError(400, f"board must be {size} rows of {size} numbers")
+        return solution, board
+
+    def verify(self, request):
+        """Whether the board is solved, and its filled cells that are wrong"""
+        solution, board = self._solution(request)
+        wrong = [[i, j] for i, row in enumerate(board) for j, num in enumerate(row)
+                 if num and num != solution[i][j]]
+        solved = not wrong and all(num for row in board for num in row)
+        return {"solved": solved, "wrong": wrong}
+
+    def hint(self, request):
+        """One correct value for a random empty or wrong cell of the board"""
+        solution, board = self._solution(request)
+        cells = [(i, j) for i, row in enumerate(board) for j, num in enumerate(row)
+                 if num != solution[i][j]]
+        if not cells:
+            return {"hint": None}
+        row, col = self.rng.choice(cells)
+        return {"hint": {"row": row, "col": col, "value": solution[row][col]}}
+
+    def stats(self):
+        return {
+            "pools": {diff: len(pool) for diff, pool in self._pools.items()},
+            "generated": self.generated,
+            "derived": self.derived,
+            "failed": self.failed,
+            "issued": len(self._issued),
+            "workers": self.workers,
+        }
+
+
+class PuzzleServer:
+    """Minimal HTTP/1.1 front end for a PuzzleService, with keep-alive"""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def dispatch(self, method, target, body):
+        """Route one request; returns (status, JSON payload)"""
+        url = urlsplit(target)
+        if url.path not in ROUTES:
+            raise HTTPError(404, f"no such endpoint: {url.path}")
+        if method != ROUTES[url.path]:
+            raise HTTPError(405, f"{url.path} only accepts {ROUTES[url.path]}")
+
+        if url.path == "/puzzle":
+            query = parse_qs(url.query)
+            difficulty = query.get("difficulty", ["متوسط"])[0]
+            puzzle_id, board = await self.service.puzzle(difficulty)
+            return {"id": puzzle_id, "difficulty": difficulty, "box_size": self.service.box_size,
+                    "board": board}
+        if url.path == "/stats":
+            return self.service.stats()
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "body must be JSON") from None
+        if not isinstance(request, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        if url.path == "/verify":
+            return self.service.verify(request)
+        return self.service.hint(request)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    method, target, _ = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, f"body over {MAX_BODY} bytes")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError:
+                    status, payload, keep_alive = 400, {"error": "malformed request"}, False
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n")
+                if not keep_alive:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + data)
+                await writer.drain()
+                STATS.count("server.requests")
+                STATS.add_time("server.request", time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, depth=SERVER_POOL_DEPTH, workers=None,
+                box_size=3, bank=None, ready=None):
+    """Run the puzzle service until cancelled or sent SIGINT/SIGTERM.
+
+    ready(port) is called once it listens. The worker processes are shut
+    down and waited for before this returns.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    handled = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+            handled.append(sig)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows, or not the main thread: only cancelling stops the server
+
+    service = PuzzleService(depth, workers, box_size, bank)
+    await service.start()
+    try:
+        server = await asyncio.start_server(PuzzleServer(service).handle, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await stopping.wait()
+    finally:
+        for sig in handled:
+            loop.remove_signal_handler(sig)
+        await service.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve Sudoku puzzles over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on (0 picks a free one)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="generator processes (default: all cores)")
+    parser.add_argument("--depth", type=int, default=SERVER_POOL_DEPTH, help="ready puzzles kept per difficulty")
+    parser.add_argument("--box-size", type=int, default=3, help="3 for 9x9, 4 for 16x16, ...")
+    parser.add_argument("--bank", default=None, help="9x9 puzzle bank to serve from")
+    args = parser.parse_args()
+
+    bank = None
+    if args.bank:
+        from .bank import PuzzleBank
+        bank = PuzzleBank(args.bank)
+
+    def ready(port):
+        print(f"Serving puzzles on http://{args.host}:{port}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.depth, args.workers, args.box_size, bank, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
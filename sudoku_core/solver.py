@@ -0,0 +1,32 @@
+"""Solving and solution counting for single boards"""
+from .generator import SudokuGenerator
+from .validation import box_size_of, is_valid_board
+
+
+def _generator(board, uniqueness_backend=None):
+    generator = SudokuGenerator(uniqueness_backend, box_size=box_size_of(board))
+    generator.board = board
+    return generator
+
+
+def solve(board):
+    """Return a solved copy of board, or None if it has no solution.
+    
+    9x9 boards use the bitmask search, bigger ones constraint propagation.
+    """
+    if not is_valid_board(board):
+        return None
+    generator = _generator(board)
+    if generator.uniqueness_backend == "propagation":
+        return generator._propagation.solve(board)
+    generator._reset_masks()
+    if generator._solve_sudoku():
+        return generator.board
+    return None
+
+
+def count_solutions(board, uniqueness_backend=None):
+    """Count solutions of board: 0, 1, or 2 meaning two or more"""
+    if not is_valid_board(board):
+        return 0
+    return _generator(board, uniqueness_backend)._count_solutions()
@@ -0,0 +1,112 @@
+"""Lightweight counters and timers for seeing where time goes.
+
+All instrumentation reports to the shared STATS registry, which ignores
+everything until it is enabled. Searches keep counting nodes and
+backtracks in plain attributes as they always do and only publish the
+totals once per puzzle, so a disabled registry costs a flag check per
+generated puzzle, records operation or frame.
+
+    from sudoku_core.stats import STATS
+    STATS.enable()
+    ...
+    STATS.export("sudoku_stats.json")
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+STATS_FILE = "sudoku_stats.json"
+
+_DISABLED = nullcontext()
+
+
+class Stats:
+    """Named counters and timers, safe to update from the generator thread"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.timers = {}  # name -> [count, total seconds, max seconds, last seconds]
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = [0, 0.0, 0.0, 0.0]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+            timer[3] = seconds
+
+    def timer(self, name):
+        """Context manager timing its block under name (a no-op while disabled)"""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Current values as plain data, with times in milliseconds"""
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "timers": {
+                    name: {
+                        "count": count,
+                        "total_ms": total * 1000,
+                        "mean_ms": total / count * 1000,
+                        "max_ms": longest * 1000,
+                        "last_ms": last * 1000,
+                    }
+                    for name, (count, total, longest, last) in sorted(self.timers.items())
+                },
+            }
+
+    def export(self, filename=STATS_FILE):
+        """Write snapshot() to filename as JSON"""
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+STATS = Stats()
+
+
+def timed(name):
+    """Decorator timing every call of a function under name while STATS is enabled"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not STATS.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STATS.add_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
@@ -0,0 +1,50 @@
+"""Grid validation helpers"""
+from math import isqrt
+
+from .constants import BOX_SIZES, geometry
+
+
+def box_size_of(board):
+    """Box size of a square board (3 for 9x9), or None if it isn't a supported size"""
+    box_size = isqrt(len(board))
+    return box_size if box_size in BOX_SIZES and box_size * box_size == len(board) else None
+
+
+def is_valid_board(board):
+    """Whether board is N x N (4x4 to 25x25) with digits 0-N and no digit repeats in a row, column or box"""
+    box_size = box_size_of(board)
+    if box_size is None:
+        return False
+    size = len(board)
+    if any(len(row) != size for row in board):
+        return False
+    box_index = geometry(box_size).box_index
+    row_masks = [0] * size
+    col_masks = [0] * size
+    box_masks = [0] * size
+    for i in range(size):
+        for j in range(size):
+            num = board[i][j]
+            if not 0 <= num <= size:
+                return False
+            if num:
+                bit = 1 << num
+                box = box_index[i][j]
+                if (row_masks[i] | col_masks[j] | box_masks[box]) & bit:
+                    return False
+                row_masks[i] |= bit
+                col_masks[j] |= bit
+                box_masks[box] |= bit
+    return True
+
+
+def is_complete(board):
+    """Whether every cell of board is filled"""
+    return all(num != 0 for row in board for num in row)
+
+
+def is_solution(board, puzzle):
+    """Whether board is a full valid grid that keeps every given of puzzle"""
+    return (is_complete(board) and is_valid_board(board) and len(puzzle) == len(board) and
+            all(given in (0, num) for puzzle_row, row in zip(puzzle, board)
+                for given, num in zip(puzzle_row, row)))
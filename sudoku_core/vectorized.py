@@ -0,0 +1,89 @@
+"""NumPy batch validation and candidate computation.
+
+Every function takes an (N, 9, 9) array of digits (0 for empty, uint8 is
+the natural dtype) and works on the whole batch with array operations;
+there is no per-grid Python loop. Large batches are processed in slices
+of chunk_size grids to bound temporary memory. Requires numpy.
+"""
+import numpy as np
+
+# Candidate masks use bit d-1 for digit d, so all nine digits are 0x1FF
+ALL_CANDIDATES = 0x1FF
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(ALL_CANDIDATES + 1)], dtype=np.uint8)
+
+
+def _as_grids(grids):
+    grids = np.asarray(grids)
+    if grids.ndim != 3 or grids.shape[1:] != (9, 9):
+        raise ValueError(f"Expected an (N, 9, 9) array, got shape {grids.shape}")
+    return grids
+
+
+def _boxes(array):
+    """View (N, 9, 9, ...) cells as (N, 3, 3, 3, 3, ...): band, row, stack, column"""
+    return array.reshape((array.shape[0], 3, 3, 3, 3) + array.shape[3:])
+
+
+def _digit_bits(grids):
+    """One-bit-per-digit representation of every cell, 0 for empty cells"""
+    digits = np.minimum(grids, 9).astype(np.int16)
+    return np.where(digits > 0, np.left_shift(1, digits - 1), 0).astype(np.uint16)
+
+
+def _validate(grids):
+    in_range = ((grids >= 0) & (grids <= 9)).all(axis=(1, 2))
+    bits = _digit_bits(grids)
+    filled = (grids != 0).astype(np.uint8)
+    # A unit has no repeated digit iff its OR of digit bits has one bit per filled cell
+    no_repeats = in_range
+    for used, cells in (
+        (np.bitwise_or.reduce(bits, axis=2), filled.sum(axis=2, dtype=np.uint8)),
+        (np.bitwise_or.reduce(bits, axis=1), filled.sum(axis=1, dtype=np.uint8)),
+        (np.bitwise_or.reduce(np.bitwise_or.reduce(_boxes(bits), axis=4), axis=2).reshape(-1, 9),
+         _boxes(filled).sum(axis=(2, 4), dtype=np.uint8).reshape(-1, 9)),
+    ):
+        no_repeats = no_repeats & (POPCOUNT[used] == cells).all(axis=1)
+    return no_repeats, filled.all(axis=(1, 2))
+
+
+def validate_batch(grids, chunk_size=65536):
+    """Return (valid, complete) boolean arrays of shape (N,).
+
+    valid: every value is 0-9 and no digit repeats in a row, column or box.
+    complete: no cell is empty. A solved grid is valid & complete.
+    """
+    grids = _as_grids(grids)
+    valid = np.empty(len(grids), dtype=bool)
+    complete = np.empty(len(grids), dtype=bool)
+    for start in range(0, len(grids), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        valid[chunk], complete[chunk] = _validate(grids[chunk])
+    return valid, complete
+
+
+def _candidates(grids):
+    bits = _digit_bits(grids)
+    rows = np.bitwise_or.reduce(bits, axis=2)[:, :, None]
+    cols = np.bitwise_or.reduce(bits, axis=1)[:, None, :]
+    boxes = np.bitwise_or.reduce(np.bitwise_or.reduce(_boxes(bits), axis=4), axis=2)
+    boxes = np.repeat(np.repeat(boxes, 3, axis=1), 3, axis=2)
+    candidates = ~(rows | cols | boxes) & ALL_CANDIDATES
+    return np.where(grids == 0, candidates, 0).astype(np.uint16)
+
+
+def candidate_masks(grids, chunk_size=65536):
+    """Return (N, 9, 9) uint16 masks of the digits each empty cell can still take.
+
+    Bit d-1 is set when digit d is possible; filled cells get 0.
+    """
+    grids = _as_grids(grids)
+    masks = np.empty(grids.shape, dtype=np.uint16)
+    for start in range(0, len(grids), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        masks[chunk] = _candidates(grids[chunk])
+    return masks
+
+
+def from_boards(boards):
+    """Stack nested-list boards into an (N, 9, 9) uint8 array"""
+    return np.asarray(boards, dtype=np.uint8).reshape(-1, 9, 9)